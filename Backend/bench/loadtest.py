@@ -0,0 +1,567 @@
+"""Banc de charge des routes des blueprints sur un jeu de donnees synthetique.
+
+Depuis Backend/:
+
+    python -m bench.loadtest --mongo mongomock --cars 200 --clients 1000 --reservations 5000
+    python -m bench.loadtest --mongo mongodb://localhost:27017/CarRentalBench --concurrency 16
+
+La base cible est videe puis remplie (bench/seed.py): son nom doit contenir
+"bench". Chaque route GET des blueprints est appelee via le client de test
+Flask (sequentiel) puis en HTTP concurrent sur un serveur local; chaque
+route POST/PUT/PATCH/DELETE l'est ensuite par --concurrency clients de test
+en parallele, sur des documents crees hors mesure. Le rapport donne
+p50/p95/p99, le debit et le nombre de commandes Mongo par requete.
+Les reponses JSON doivent garder le format du frontend (ids en string,
+dates ISO): sinon la commande echoue apres le rapport.
+
+Avec --mongo mongomock, seul le MongoClient est remplace: PyMongo.init_app
+et create_app s'executent comme en production. mongomock (bench/requirements.txt)
+n'implemente pas tout ($convert, $text): les routes concernees
+repondent 500 avec --mongo mongomock, et les latences ne sont comparables
+qu'entre deux executions sur la meme cible.
+"""
+import io
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from urllib.error import HTTPError
+from urllib.parse import quote, urlsplit
+from urllib.request import Request, urlopen
+
+import click
+from bson import ObjectId
+
+# Parametres d'URL remplaces par les ids du jeu seede
+PATH_PARAMS = {
+    "car_id": "car_id",
+    "client_id": "client_id",
+    "reservation_id": "reservation_id",
+    "image_id": "image_id",
+}
+# Valeurs fixes des autres parametres
+FIXED_PARAMS = {"collection": "voitures"}
+# Routes sans interet pour le banc (fichiers statiques)
+SKIPPED_ENDPOINTS = {"static", "uploaded_file"}
+# Dates renvoyees par MongoJSONProvider (isoformat) ou format_date
+ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}([T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?([+-]\d{2}:\d{2}|Z)?)?$")
+
+
+class RoundTrips:
+    """Compte les commandes envoyees a Mongo (tous threads confondus)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def add(self, n=1):
+        with self._lock:
+            self.count += n
+
+
+def count_pymongo(counter):
+    from pymongo import monitoring
+
+    class Listener(monitoring.CommandListener):
+        def started(self, event):
+            counter.add()
+
+        def succeeded(self, event):
+            pass
+
+        def failed(self, event):
+            pass
+
+    # Doit preceder la creation du MongoClient par flask_pymongo
+    monitoring.register(Listener())
+
+
+MOCK_METHODS = (
+    "find", "find_one", "find_one_and_update", "find_one_and_replace", "find_one_and_delete",
+    "aggregate", "count_documents", "estimated_document_count", "distinct",
+    "insert_one", "insert_many", "update_one", "update_many", "replace_one",
+    "delete_one", "delete_many", "bulk_write",
+)
+
+
+def count_mongomock(counter, collection_class):
+    # mongomock n'emet pas d'evenements de monitoring: un appel = une commande,
+    # sans compter les appels internes de mongomock ($lookup, GridFS...)
+    depth = threading.local()
+
+    for name in MOCK_METHODS:
+        method = getattr(collection_class, name)
+
+        def counted(self, *args, _method=method, **kwargs):
+            if getattr(depth, "value", 0) == 0:
+                counter.add()
+            depth.value = getattr(depth, "value", 0) + 1
+            try:
+                return _method(self, *args, **kwargs)
+            finally:
+                depth.value -= 1
+
+        setattr(collection_class, name, counted)
+
+
+def connect(target, counter):
+    """Retourne la base a seeder et y dirige MONGO_URI (avant l'import de config)."""
+    if target == "mongomock":
+        try:
+            import mongomock
+        except ImportError:
+            raise click.ClickException("mongomock n'est pas installe (pip install -r bench/requirements.txt)")
+        import flask_pymongo
+
+        client = mongomock.MongoClient()
+        db_name = "CarRentalBench"
+
+        def mock_client(*args, **kwargs):
+            # Seul le client change: le vrai PyMongo.init_app s'execute (provider JSON,
+            # convertisseur ObjectId); options de pool et listeners sont ignores
+            return mongomock.MongoClient(_store=client._store)
+
+        flask_pymongo.MongoClient = mock_client
+        os.environ["MONGO_URI"] = f"mongodb://localhost:27017/{db_name}"
+        # Images de /admin/image/<id>: GridFS sur mongomock
+        from mongomock.gridfs import enable_gridfs_integration
+        enable_gridfs_integration()
+        count_mongomock(counter, mongomock.collection.Collection)
+        return client[db_name]
+
+    from pymongo import MongoClient
+
+    db_name = urlsplit(target).path.lstrip("/")
+    if "bench" not in db_name.lower():
+        raise click.ClickException(f"La base '{db_name}' serait videe: utilisez une base dont le nom contient 'bench'")
+    os.environ["MONGO_URI"] = target
+    count_pymongo(counter)
+    return MongoClient(target)[db_name]
+
+
+def _is_iso_date(value):
+    return value is None or (isinstance(value, str) and ISO_DATE.match(value) is not None)
+
+
+def shape_errors(payload, path="$"):
+    """Ecarts au format attendu par le frontend: ids en string, dates ISO 8601.
+
+    Detecte notamment le JSON etendu ({"$oid": ...}, {"$date": ...}) que
+    produirait un autre provider JSON que MongoJSONProvider.
+    """
+    errors = []
+    if isinstance(payload, list):
+        for index, item in enumerate(payload):
+            errors += shape_errors(item, f"{path}[{index}]")
+    elif isinstance(payload, dict):
+        extended = [key for key in payload if key.startswith("$")]
+        if extended:
+            return [f"{path}: JSON etendu ({', '.join(extended)})"]
+        for key, value in payload.items():
+            # Les references (client_id...) peuvent etre des documents embarques, verifies recursivement
+            if key == "_id" and not (value is None or isinstance(value, str)):
+                errors.append(f"{path}.{key}: id non string")
+                continue
+            if key.startswith("date") and not isinstance(value, (dict, list)) and not _is_iso_date(value):
+                errors.append(f"{path}.{key}: date non ISO ({value!r})")
+                continue
+            errors += shape_errors(value, f"{path}.{key}")
+    return errors
+
+
+def check_shapes(app, cookie, routes):
+    """{route: ecarts} pour les reponses JSON 200 hors du format attendu."""
+    client = app.test_client()
+    client.set_cookie("session", cookie)
+    problems = {}
+    for name, url in routes:
+        response = client.get(url)
+        if response.status_code == 200 and response.is_json:
+            errors = shape_errors(response.get_json())
+            if errors:
+                problems[name] = errors[:5]
+    return problems
+
+
+def scenarios(app, ids):
+    """[(nom, url)] pour chaque route GET, plus des variantes de query string."""
+    from utils.dates import today
+
+    start = today()
+    week = f"from={start:%Y-%m-%d}&to={start + timedelta(days=6):%Y-%m-%d}"
+    queries = {
+        "/cars/search": ["type_carburant=Diesel&prix_max=500&sort=price-asc", "options=GPS&page=2"],
+        "/manager/clients/search": [f"q={quote(ids['client_query'])}", "q=L00001"],
+        "/manager/calendar/reservations": [week, week + "&format=timeline", ""],
+        "/manager/cars/available": [week.replace("from=", "start=").replace("to=", "end=")],
+        "/admin/image/<image_id>": ["", "size=thumb"],
+        "/admin/analytics/revenue": ["group=month", "group=car", "group=fuel"],
+        "/admin/analytics/daily": [week],
+        "/manager/clients": ["", "limit=100"],
+    }
+
+    found, skipped = [], []
+    seen = set()
+    for rule in sorted(app.url_map.iter_rules(), key=lambda r: r.rule):
+        if "GET" not in rule.methods or rule.endpoint in SKIPPED_ENDPOINTS or rule.rule in seen:
+            continue
+        seen.add(rule.rule)
+        values = {}
+        for name in rule.arguments:
+            value = ids.get(PATH_PARAMS[name]) if name in PATH_PARAMS else FIXED_PARAMS.get(name)
+            if value is None:
+                break
+            values[name] = value
+        else:
+            path = rule.rule
+            for name, value in values.items():
+                path = path.replace(f"<{name}>", value).replace(f"<string:{name}>", value)
+            for query in queries.get(rule.rule, [""]):
+                found.append((rule.rule + (f"?{query}" if query else ""), path + (f"?{query}" if query else "")))
+            continue
+        skipped.append(rule.rule)
+    return found, skipped
+
+
+def _bench_car():
+    return {
+        "_id": ObjectId(), "marque": "Dacia", "modele": "Logan", "annee": 2022,
+        "immatriculation": f"W-{uuid.uuid4().hex[:8]}", "couleur": "Blanc", "kilometrage": 1000,
+        "prix_journalier": 300, "status": "disponible", "type_carburant": "Diesel",
+        "nombre_places": 5, "options": ["GPS"], "date_ajout": datetime.utcnow(),
+    }
+
+
+def _client_body():
+    suffix = uuid.uuid4().hex[:8]
+    return {
+        "nom": "Bench", "prenom": "Ecriture", "email": f"bench.{suffix}@example.com",
+        "telephone": "+212600000000",
+        "adresse": {"rue": "1 rue Bench", "immeuble": "", "appartement": "", "ville": "Tetouan", "code_postal": "93000"},
+        "CIN": f"W{suffix.upper()}", "permis_conduire": "B", "numero_permis": f"PW{suffix.upper()}",
+    }
+
+
+def _car_json():
+    return {key: value for key, value in _bench_car().items() if key not in ("_id", "date_ajout")}
+
+
+def _car_form(image):
+    return {
+        "marque": "Dacia", "modele": "Sandero", "annee": "2023", "immatriculation": f"W-{uuid.uuid4().hex[:8]}",
+        "couleur": "Gris", "kilometrage": "500", "prix_journalier": "350", "status": "disponible",
+        "type_carburant": "Essence", "nombre_places": "5", "options": "GPS,Bluetooth",
+        "image": (io.BytesIO(image), "bench.png", "image/png"),
+    }
+
+
+def _png():
+    from PIL import Image
+    buffer = io.BytesIO()
+    Image.new("RGB", (800, 600), (160, 90, 40)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def write_scenarios(app, db, ids):
+    """[(nom, preparer)] pour chaque route d'ecriture des blueprints.
+
+    preparer() cree dans `db`, hors mesure, ce que la requete modifie ou
+    supprime (une voiture neuve par reservation: pas de conflit entre
+    requetes) et retourne (methode, url, kwargs du client de test).
+    """
+    from bench.seed import ADMIN_EMAIL, ADMIN_PASSWORD
+    from utils.dates import today
+
+    image = _png()
+    start = today() + timedelta(days=30)
+    period = {"startDate": f"{start:%Y-%m-%d}", "endDate": f"{start + timedelta(days=2):%Y-%m-%d}"}
+
+    def new_car():
+        car = _bench_car()
+        db.voitures.insert_one(car)
+        return str(car["_id"])
+
+    def new_client():
+        client = {"_id": ObjectId(), **_client_body()}
+        db.clients.insert_one(client)
+        return str(client["_id"])
+
+    def new_reservation(statut="refusée"):
+        # Statut inactif: aucun jour d'occupation a creer hors API
+        reservation = {
+            "_id": ObjectId(), "client_id": ObjectId(ids["client_id"]), "voiture_id": ObjectId(new_car()),
+            "date_debut": start, "date_fin": start + timedelta(days=2), "prix_total": 900, "statut": statut,
+            "date_reservation": today(), "paiement": {"methode": "carte", "statut": "non payée"},
+        }
+        db.reservations.insert_one(reservation)
+        return reservation
+
+    def new_manager():
+        manager = {"_id": ObjectId(), "nom": "Bench", "prenom": "Manager", "email": f"m.{uuid.uuid4().hex[:8]}@example.com"}
+        db.managers.insert_one(manager)
+        return str(manager["_id"])
+
+    def add_reservation():
+        return "POST", "/manager/reservations", {"json": {
+            "clientId": ids["client_id"], "carId": new_car(),
+            "reservationDetails": {**period, "totalAmount": 900, "paymentMethod": "carte", "paymentStatus": "non payée"},
+        }}
+
+    def update_reservation():
+        reservation = new_reservation()
+        return "PUT", f"/manager/reservations/{reservation['_id']}", {"json": {
+            "client_id": ids["client_id"], "car_id": str(reservation["voiture_id"]),
+            **period, "status": "acceptée", "totalAmount": 950,
+        }}
+
+    def patch_reservation():
+        return "PATCH", f"/manager/reservations/{new_reservation()['_id']}", {"json": {
+            "status": "acceptée", "paymentStatus": "payée",
+        }}
+
+    def delete_reservation():
+        return "DELETE", f"/manager/reservations/{new_reservation()['_id']}", {}
+
+    def add_manager():
+        return "POST", "/admin/managers", {"json": {"nom": "Bench", "email": f"m.{uuid.uuid4().hex[:8]}@example.com"}}
+
+    handlers = {
+        ("POST", "/admin/login"): lambda: ("POST", "/admin/login", {"json": {"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD}}),
+        ("POST", "/manager/reservations"): add_reservation,
+        ("PUT", "/manager/reservations/<reservation_id>"): update_reservation,
+        ("PATCH", "/manager/reservations/<reservation_id>"): patch_reservation,
+        ("DELETE", "/manager/reservations/<reservation_id>"): delete_reservation,
+        ("POST", "/manager/clients"): lambda: ("POST", "/manager/clients", {"json": _client_body()}),
+        ("PUT", "/manager/clients/<client_id>"): lambda: ("PUT", f"/manager/clients/{new_client()}", {"json": _client_body()}),
+        ("DELETE", "/manager/clients/<client_id>"): lambda: ("DELETE", f"/manager/clients/{new_client()}", {}),
+        ("POST", "/manager/cars"): lambda: ("POST", "/manager/cars", {"json": _car_json()}),
+        ("PUT", "/manager/cars/<car_id>"): lambda: ("PUT", f"/manager/cars/{new_car()}", {"json": _car_json()}),
+        ("DELETE", "/manager/cars/<car_id>"): lambda: ("DELETE", f"/manager/cars/{new_car()}", {}),
+        # Upload: image originale et variantes ecrites dans GridFS
+        ("POST", "/admin/voiture"): lambda: ("POST", "/admin/voiture", {"data": _car_form(image)}),
+        ("PUT", "/admin/voiture/<id>"): lambda: ("PUT", f"/admin/voiture/{new_car()}", {"data": _car_form(image)}),
+        ("DELETE", "/admin/voiture/<id>"): lambda: ("DELETE", f"/admin/voiture/{new_car()}", {}),
+        ("POST", "/admin/managers"): add_manager,
+        ("PUT", "/admin/managers/<id>"): lambda: ("PUT", f"/admin/managers/{new_manager()}", {"json": {"telephone": "+212500000000"}}),
+        ("DELETE", "/admin/managers/<id>"): lambda: ("DELETE", f"/admin/managers/{new_manager()}", {}),
+        ("POST", "/manager"): add_manager,
+        ("PUT", "/Update_manager/<id>"): lambda: ("PUT", f"/Update_manager/{new_manager()}", {"json": {"statut": "actif"}}),
+        ("DELETE", "/Delete_manager/<id>"): lambda: ("DELETE", f"/Delete_manager/{new_manager()}", {}),
+    }
+
+    found, skipped = [], []
+    for rule in sorted(app.url_map.iter_rules(), key=lambda r: r.rule):
+        for method in sorted(rule.methods & {"POST", "PUT", "PATCH", "DELETE"}):
+            handler = handlers.get((method, rule.rule))
+            if handler is None:
+                skipped.append(f"{method} {rule.rule}")
+            else:
+                found.append((f"{method} {rule.rule}", handler))
+    return found, skipped
+
+
+def percentile(values, p):
+    return values[min(len(values) - 1, int(p * len(values)))] * 1000 if values else 0
+
+
+def summarize(name, latencies, statuses, elapsed, commands):
+    latencies.sort()
+    return {
+        "route": name,
+        "requests": len(latencies),
+        "statuses": sorted(set(statuses)),
+        "p50_ms": percentile(latencies, 0.5),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99),
+        "req_per_s": len(latencies) / elapsed if elapsed else 0,
+        "mongo_per_request": commands / len(latencies) if latencies else 0,
+    }
+
+
+def run_client(app, cookie, routes, requests, counter):
+    client = app.test_client()
+    client.set_cookie("session", cookie)
+    results = []
+    for name, url in routes:
+        client.get(url).close()  # echauffement (caches, index)
+        latencies, statuses = [], []
+        commands = counter.count
+        began = time.perf_counter()
+        for _ in range(requests):
+            t0 = time.perf_counter()
+            response = client.get(url)
+            response.get_data()
+            latencies.append(time.perf_counter() - t0)
+            statuses.append(response.status_code)
+        elapsed = time.perf_counter() - began
+        results.append(summarize(name, latencies, statuses, elapsed, counter.count - commands))
+    return results
+
+
+def run_http(app, cookie, routes, requests, concurrency, counter):
+    from werkzeug.serving import make_server
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    def fetch(url):
+        t0 = time.perf_counter()
+        try:
+            with urlopen(Request(base + url, headers={"Cookie": f"session={cookie}"}), timeout=60) as response:
+                response.read()
+                status = response.status
+        except HTTPError as e:
+            status = e.code
+        return time.perf_counter() - t0, status
+
+    results = []
+    try:
+        with ThreadPoolExecutor(concurrency) as pool:
+            for name, url in routes:
+                fetch(url)
+                commands = counter.count
+                began = time.perf_counter()
+                done = list(pool.map(fetch, [url] * requests))
+                elapsed = time.perf_counter() - began
+                results.append(summarize(
+                    name, [d[0] for d in done], [d[1] for d in done], elapsed, counter.count - commands
+                ))
+    finally:
+        server.shutdown()
+    return results
+
+
+def run_writes(app, cookie, routes, requests, concurrency, counter):
+    """Ecritures en parallele; retourne (resultats, {route: ecarts de format})."""
+    local = threading.local()
+
+    def client():
+        if not hasattr(local, "client"):
+            local.client = app.test_client()
+            local.client.set_cookie("session", cookie)
+        return local.client
+
+    def send(prepared):
+        method, url, kwargs = prepared
+        t0 = time.perf_counter()
+        response = client().open(url, method=method, **kwargs)
+        response.get_data()
+        return time.perf_counter() - t0, response.status_code, response.get_json(silent=True)
+
+    results, problems = [], {}
+    with ThreadPoolExecutor(concurrency) as pool:
+        for name, prepare in routes:
+            # Documents crees avant la mesure: seules les requetes comptent
+            prepared = [prepare() for _ in range(requests)]
+            commands = counter.count
+            began = time.perf_counter()
+            done = list(pool.map(send, prepared))
+            elapsed = time.perf_counter() - began
+            results.append(summarize(
+                name, [d[0] for d in done], [d[1] for d in done], elapsed, counter.count - commands
+            ))
+            errors = shape_errors(done[0][2]) if done and done[0][1] < 300 and done[0][2] is not None else []
+            if errors:
+                problems[name] = errors[:5]
+    return results, problems
+
+
+def print_report(title, results):
+    click.echo(f"\n{title}")
+    click.echo(f"{'route':<58} {'status':<9} {'p50':>8} {'p95':>8} {'p99':>8} {'req/s':>8} {'mongo':>6}")
+    for r in results:
+        statuses = ",".join(str(s) for s in r["statuses"])
+        click.echo(
+            f"{r['route'][:58]:<58} {statuses:<9} {r['p50_ms']:>6.1f}ms {r['p95_ms']:>6.1f}ms "
+            f"{r['p99_ms']:>6.1f}ms {r['req_per_s']:>8.0f} {r['mongo_per_request']:>6.1f}"
+        )
+
+
+@click.command()
+@click.option("--mongo", "target", default="mongomock", show_default=True,
+              help="'mongomock' ou URI d'un mongod local (base *bench*, videe).")
+@click.option("--cars", default=200, show_default=True)
+@click.option("--clients", default=1000, show_default=True)
+@click.option("--reservations", default=5000, show_default=True)
+@click.option("--requests", default=50, show_default=True, help="Requetes par route et par mode.")
+@click.option("--concurrency", default=8, show_default=True, help="Clients HTTP en parallele.")
+@click.option("--mode", type=click.Choice(["client", "http", "both"]), default="both", show_default=True)
+@click.option("--route", "route_filter", default=None, help="Ne garde que les routes contenant ce texte.")
+@click.option("--json", "json_path", default=None, help="Ecrit aussi les resultats dans ce fichier.")
+@click.option("--seed", "random_seed", default=42, show_default=True)
+@click.option("--verbose", is_flag=True, help="Affiche les traces des erreurs 500.")
+def main(target, cars, clients, reservations, requests, concurrency, mode, route_filter, json_path, random_seed, verbose):
+    counter = RoundTrips()
+    if not verbose:
+        os.environ.setdefault("LOG_ACCESS", "false")
+    db = connect(target, counter)
+
+    from bench.seed import ADMIN_EMAIL, ADMIN_PASSWORD, seed
+
+    began = time.perf_counter()
+    ids = seed(db, cars=cars, clients=clients, reservations=reservations, random_seed=random_seed)
+    click.echo(f"seed: {ids['counts']} en {time.perf_counter() - began:.1f}s")
+
+    from main import create_app
+    from utils.json_provider import MongoJSONProvider
+
+    app = create_app()
+    if type(app.json) is not MongoJSONProvider:
+        raise click.ClickException(f"app.json est {type(app.json).__name__}, pas MongoJSONProvider")
+    if not verbose:
+        # Les 500 restent visibles dans la colonne status
+        app.logger.setLevel(logging.CRITICAL)
+        logging.getLogger("blueprints").setLevel(logging.CRITICAL)
+    login = app.test_client()
+    response = login.post("/admin/login", json={"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD})
+    if response.status_code != 200:
+        raise click.ClickException("Connexion admin impossible")
+    cookie = login.get_cookie("session").value
+
+    routes, skipped = scenarios(app, ids)
+    writes, skipped_writes = write_scenarios(app, db, ids)
+    if route_filter:
+        routes = [route for route in routes if route_filter in route[0]]
+        writes = [route for route in writes if route_filter in route[0]]
+    if skipped:
+        click.echo(f"routes ignorees (parametre inconnu): {', '.join(skipped)}")
+    if skipped_writes:
+        click.echo(f"ecritures ignorees (pas de scenario): {', '.join(skipped_writes)}")
+
+    report = {"target": target, "dataset": ids["counts"], "requests": requests, "concurrency": concurrency}
+    report["shape_errors"] = check_shapes(app, cookie, routes)
+    for name, errors in report["shape_errors"].items():
+        for error in errors:
+            click.echo(f"format {name}: {error}")
+    if mode in ("client", "both"):
+        report["client"] = run_client(app, cookie, routes, requests, counter)
+        print_report("Client de test Flask (sequentiel)", report["client"])
+    if mode in ("http", "both"):
+        report["http"] = run_http(app, cookie, routes, requests, concurrency, counter)
+        print_report(f"HTTP, {concurrency} clients en parallele", report["http"])
+    if writes:
+        report["writes"], write_errors = run_writes(app, cookie, writes, requests, concurrency, counter)
+        report["shape_errors"].update(write_errors)
+        for name, errors in write_errors.items():
+            for error in errors:
+                click.echo(f"format {name}: {error}")
+        print_report(f"Ecritures, {concurrency} clients de test en parallele", report["writes"])
+
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump(report, f, indent=2)
+        click.echo(f"\nresultats: {json_path}")
+
+    if report["shape_errors"]:
+        raise click.ClickException(f"{len(report['shape_errors'])} route(s) hors du format JSON attendu")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+"""App WSGI de production sur mongomock, pour bench/scaling.py sans mongod.
+
+Chaque worker gunicorn seede sa propre base en memoire (BENCH_CARS,
+BENCH_CLIENTS, BENCH_RESERVATIONS): seules les routes sans id sont comparables.
+"""
+import os
+
+from bench.loadtest import RoundTrips, connect
+from bench.seed import seed
+
+# connect() fixe MONGO_URI: config doit etre importe apres
+seed(
+    connect("mongomock", RoundTrips()),
+    cars=int(os.getenv("BENCH_CARS", 200)),
+    clients=int(os.getenv("BENCH_CLIENTS", 1000)),
+    reservations=int(os.getenv("BENCH_RESERVATIONS", 5000)),
+)
+
+from config import ProdConfig
+from main import create_app
+
+app = create_app(ProdConfig)
@@ -0,0 +1,178 @@
+"""Debit de l'entree de production (gunicorn, wsgi.py) selon le nombre de workers.
+
+Depuis Backend/:
+
+    python -m bench.scaling --mongo mongodb://localhost:27017/CarRentalBench --workers 1,2,4,8
+    python -m bench.scaling --mongo mongomock --workers 1,2,4
+
+Pour chaque nombre de workers, lance gunicorn -c gunicorn.conf.py (ProdConfig,
+WEB_THREADS threads par worker, pool Mongo dimensionne en consequence),
+envoie --requests requetes HTTP avec --concurrency clients en parallele sur
+un melange de routes de lecture, puis arrete le serveur. Le generateur de
+charge tourne sur la meme machine: il faut plus de coeurs que de workers
+pour que le debit mesure soit celui du serveur.
+"""
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from urllib.error import HTTPError, URLError
+from urllib.request import urlopen
+
+import click
+
+from bench.loadtest import connect, percentile, RoundTrips, shape_errors
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def default_routes():
+    from utils.dates import today
+
+    start = today()
+    week = f"from={start:%Y-%m-%d}&to={start + timedelta(days=6):%Y-%m-%d}"
+    return [
+        "/cars/search?type_carburant=Diesel&sort=price-asc",
+        "/manager/reservations",
+        f"/manager/calendar/reservations?{week}",
+        f"/manager/cars/available?start={start:%Y-%m-%d}&end={start + timedelta(days=6):%Y-%m-%d}",
+        "/manager/dashboard/stats",
+    ]
+
+
+def available_cores():
+    # Coeurs reellement utilisables (conteneur, taskset), pas ceux de la machine
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def fetch(url):
+    t0 = time.perf_counter()
+    try:
+        with urlopen(url, timeout=60) as response:
+            response.read()
+            status = response.status
+    except HTTPError as e:
+        status = e.code
+    except URLError:
+        status = 0
+    return time.perf_counter() - t0, status
+
+
+def wait_ready(base, process, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise click.ClickException("gunicorn s'est arrete au demarrage")
+        if fetch(base + "/stats")[1] == 200:
+            return
+        time.sleep(0.2)
+    raise click.ClickException("gunicorn ne repond pas")
+
+
+def check_shapes(base, routes):
+    """Les reponses JSON doivent garder le format du frontend (ids en string, dates ISO)."""
+    for route in routes:
+        try:
+            with urlopen(base + route, timeout=60) as response:
+                if response.headers.get_content_type() != "application/json":
+                    continue
+                errors = shape_errors(json.loads(response.read()))
+        except HTTPError:
+            continue
+        if errors:
+            raise click.ClickException(f"{route}: {'; '.join(errors[:5])}")
+
+
+def run(app_target, env, workers, threads, routes, requests, concurrency, warmup):
+    port = free_port()
+    env = dict(env, WEB_WORKERS=str(workers), WEB_THREADS=str(threads), WEB_BIND=f"127.0.0.1:{port}", LOG_ACCESS="false")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", app_target],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        wait_ready(base, process)
+        check_shapes(base, routes)
+        urls = [base + routes[i % len(routes)] for i in range(requests)]
+        with ThreadPoolExecutor(concurrency) as pool:
+            # Laisse demarrer tous les workers (et remplir caches et pools) avant de mesurer
+            warmup_end = time.monotonic() + warmup
+            while time.monotonic() < warmup_end:
+                list(pool.map(fetch, urls[:concurrency * 4]))
+            began = time.perf_counter()
+            done = list(pool.map(fetch, urls))
+            elapsed = time.perf_counter() - began
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+    latencies = sorted(d[0] for d in done)
+    return {
+        "workers": workers,
+        "threads": threads,
+        "req_per_s": len(done) / elapsed,
+        "p50_ms": percentile(latencies, 0.5),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99),
+        "errors": sum(1 for d in done if d[1] != 200),
+    }
+
+
+@click.command()
+@click.option("--mongo", "target", default="mongomock", show_default=True,
+              help="'mongomock' ou URI d'un mongod local (base *bench*, videe et seedee une fois).")
+@click.option("--workers", "worker_counts", default="1,2,4", show_default=True, help="Nombres de workers a comparer.")
+@click.option("--threads", default=8, show_default=True, help="Threads par worker (WEB_THREADS).")
+@click.option("--requests", default=2000, show_default=True)
+@click.option("--concurrency", default=32, show_default=True)
+@click.option("--warmup", default=5.0, show_default=True, help="Secondes de charge non mesuree avant chaque mesure.")
+@click.option("--cars", default=200, show_default=True)
+@click.option("--clients", default=1000, show_default=True)
+@click.option("--reservations", default=5000, show_default=True)
+def main(target, worker_counts, threads, requests, concurrency, warmup, cars, clients, reservations):
+    env = dict(os.environ)
+    # ProdConfig exige une SECRET_KEY; les sessions ne servent pas ici
+    env.setdefault("SECRET_KEY", "bench")
+    if target == "mongomock":
+        app_target = "bench.mock_wsgi:app"
+        env.update(BENCH_CARS=str(cars), BENCH_CLIENTS=str(clients), BENCH_RESERVATIONS=str(reservations))
+    else:
+        from bench.seed import seed
+
+        seed(connect(target, RoundTrips()), cars=cars, clients=clients, reservations=reservations)
+        app_target = "wsgi:app"
+        env["MONGO_URI"] = target
+
+    routes = default_routes()
+    cores = available_cores()
+    counts = [int(n) for n in worker_counts.split(",")]
+    click.echo(f"{cores} coeur(s), {threads} threads/worker, {concurrency} clients, {requests} requetes")
+    if max(counts) >= cores:
+        # Le generateur de charge a besoin d'au moins un coeur a lui
+        click.echo(f"Attention: les mesures a {cores} worker(s) ou plus ne montrent pas la montee en charge "
+                   f"(marque *); il faut une machine avec plus de {max(counts)} coeurs")
+    click.echo(f"{'workers':>7} {'req/s':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'erreurs':>8}")
+    for workers in counts:
+        r = run(app_target, env, workers, threads, routes, requests, concurrency, warmup)
+        click.echo(
+            f"{r['workers']:>7} {r['req_per_s']:>8.0f} {r['p50_ms']:>7.1f}ms "
+            f"{r['p95_ms']:>7.1f}ms {r['p99_ms']:>7.1f}ms {r['errors']:>8}"
+            + (" *" if workers >= cores else "")
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+import io
+import random
+from datetime import datetime, timedelta
+
+import bcrypt
+from bson import ObjectId
+import gridfs
+from werkzeug.datastructures import FileStorage
+from utils.availability import ACTIVE_STATUSES, booked_days
+from utils.dates import today
+from utils.images import store_image
+from utils.names import name_keys
+
+ADMIN_EMAIL = "admin@location.com"
+ADMIN_PASSWORD = "Admin1234"
+
+MARQUES = {
+    "Toyota": ["Corolla", "Yaris", "RAV4"],
+    "Renault": ["Clio", "Megane", "Symbol"],
+    "Peugeot": ["208", "308", "3008"],
+    "Dacia": ["Logan", "Sandero", "Duster"],
+    "Mercedes": ["Classe A", "Classe C"],
+}
+CARBURANTS = ["Essence", "Diesel", "Hybride", "Electrique", "GPL"]
+OPTIONS = ["GPS", "Climatisation", "Bluetooth", "Caméra de recul", "Sièges chauffants", "Toit ouvrant"]
+PRENOMS = ["Mohamed", "Nada", "Wiam", "Youssef", "Salma", "Omar", "Imane", "Hamza", "Khadija", "Anas"]
+NOMS = ["Sadki", "El Mourabet", "Ez-zahori", "Bennani", "Alaoui", "Tazi", "Idrissi", "Amrani", "Berrada"]
+VILLES = ["Tetouan", "Tanger", "Rabat", "Casablanca", "Fes"]
+PAIEMENTS = ["carte", "cash"]
+
+
+def _png(filename):
+    from PIL import Image
+    buffer = io.BytesIO()
+    Image.new("RGB", (800, 600), (40, 90, 160)).save(buffer, "PNG")
+    buffer.seek(0)
+    return FileStorage(buffer, filename=filename, content_type="image/png")
+
+
+def _voiture(rng, index, image_id=None):
+    marque = rng.choice(list(MARQUES))
+    return {
+        "_id": ObjectId(),
+        "marque": marque,
+        "modele": rng.choice(MARQUES[marque]),
+        "annee": rng.randint(2015, 2025),
+        "immatriculation": f"{index:05d}-{rng.choice('ABDEH')}-{rng.randint(1, 89)}",
+        "couleur": rng.choice(["Blanc", "Noir", "Gris", "Bleu", "Rouge"]),
+        "kilometrage": rng.randint(1000, 200000),
+        "prix_journalier": rng.choice([250, 300, 350, 400, 500, 700, 900]),
+        "status": "disponible",
+        "type_carburant": rng.choice(CARBURANTS),
+        "nombre_places": rng.choice([2, 4, 5, 5, 7]),
+        "options": rng.sample(OPTIONS, rng.randint(0, 4)),
+        "date_ajout": datetime.utcnow() - timedelta(days=rng.randint(0, 900)),
+        "image": "",
+        "image_id": image_id,
+    }
+
+
+def _client(rng, index):
+    prenom, nom = rng.choice(PRENOMS), rng.choice(NOMS)
+    return {
+        "_id": ObjectId(),
+        "nom": nom,
+        "prenom": prenom,
+        "email": f"{prenom.lower()}.{nom.lower().replace(' ', '')}{index}@example.com",
+        "telephone": f"+2126{index:08d}",
+        "adresse": {
+            "rue": f"{rng.randint(1, 200)} rue Mohammed V",
+            "immeuble": "", "appartement": "",
+            "ville": rng.choice(VILLES),
+            "code_postal": "93000",
+        },
+        "permis_conduire": "B",
+        "numero_permis": f"P{index:09d}",
+        "date_expiration": datetime(2030, 12, 31),
+        "CIN": f"L{index:07d}",
+        "date_ajout": datetime.utcnow() - timedelta(days=rng.randint(0, 900)),
+        **name_keys(nom, prenom),
+    }
+
+
+def _reservations(rng, count, cars, clients, managers):
+    """Reservations sans chevauchement actif: sequentielles par voiture, passe et futur."""
+    per_car = max(1, -(-count // max(len(cars), 1)))
+    # Environ la moitie des reservations dans le passe, l'autre a venir
+    origin = today() - timedelta(days=per_car * 3)
+    reservations = []
+    for car in cars:
+        day = origin + timedelta(days=rng.randint(0, 5))
+        for _ in range(per_car):
+            if len(reservations) >= count:
+                return reservations
+            length = rng.randint(1, 7)
+            statut = rng.choices(["acceptée", "en attente", "refusée"], weights=[6, 2, 2])[0]
+            prix = car["prix_journalier"] * length
+            paye = statut == "acceptée" and rng.random() < 0.8
+            manager = rng.choice(managers)["_id"]
+            reservations.append({
+                "_id": ObjectId(),
+                "client_id": rng.choice(clients)["_id"],
+                "voiture_id": car["_id"],
+                "manager_traiteur_id": manager,
+                "manager_createur_id": manager,
+                "date_debut": day,
+                "date_fin": day + timedelta(days=length - 1),
+                # Comme dans les fixtures, une partie des montants est stockee en string
+                "prix_total": str(prix) if rng.random() < 0.2 else prix,
+                "discount": rng.choice([0, 0, 10, 20]),
+                "statut": statut,
+                "date_reservation": day - timedelta(days=rng.randint(0, 10)),
+                "paiement": {
+                    "methode": rng.choice(PAIEMENTS),
+                    "statut": "payée" if paye else "non payée",
+                },
+            })
+            day += timedelta(days=length + rng.randint(0, 3))
+    return reservations
+
+
+def seed(db, cars=200, clients=1000, reservations=5000, managers=5, images=1, random_seed=42):
+    """Vide puis remplit `db` avec un jeu synthetique de la forme des fixtures JSON.
+
+    Retourne les ids utiles pour parametrer les routes.
+    """
+    rng = random.Random(random_seed)
+    for name in db.list_collection_names():
+        if not name.startswith("system."):
+            db.drop_collection(name)
+
+    image_ids = []
+    if images:
+        fs = gridfs.GridFS(db)
+        image_ids = [store_image(fs, _png(f"bench-{i}.png"), f"bench-{i}.png") for i in range(images)]
+
+    password = bcrypt.hashpw(ADMIN_PASSWORD.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    db.admins.insert_one({"nom": "Admin", "email": ADMIN_EMAIL, "mdp": password})
+    manager_docs = [{
+        "_id": ObjectId(), "nom": rng.choice(NOMS), "prenom": rng.choice(PRENOMS),
+        "email": f"manager{i}@example.com", "mot_de_passe": password,
+        "telephone": f"+2125{i:08d}", "date_creation": datetime.utcnow(), "statut": "actif",
+    } for i in range(managers)]
+    db.managers.insert_many(manager_docs)
+
+    car_docs = [
+        _voiture(rng, i, image_ids[i % len(image_ids)] if image_ids else None)
+        for i in range(cars)
+    ]
+    client_docs = [_client(rng, i) for i in range(clients)]
+    reservation_docs = _reservations(rng, reservations, car_docs, client_docs, manager_docs)
+    # Occupation des reservations actives, comme flask rebuild-occupancy (jamais faite au demarrage)
+    occupancy_docs = [
+        {"voiture_id": reservation["voiture_id"], "day": day, "reservation_id": reservation["_id"]}
+        for reservation in reservation_docs if reservation["statut"] in ACTIVE_STATUSES
+        for day in booked_days(reservation["date_debut"], reservation["date_fin"])
+    ]
+    for collection, docs in (
+        ("voitures", car_docs), ("clients", client_docs),
+        ("reservations", reservation_docs), ("occupancy", occupancy_docs),
+    ):
+        if docs:
+            db[collection].insert_many(docs)
+
+    return {
+        "car_id": str(car_docs[0]["_id"]),
+        "client_id": str(client_docs[0]["_id"]),
+        "reservation_id": str(reservation_docs[0]["_id"]),
+        "manager_id": str(manager_docs[0]["_id"]),
+        "image_id": str(image_ids[0]) if image_ids else None,
+        "client_query": client_docs[0]["nom"],
+        "counts": {"voitures": len(car_docs), "clients": len(client_docs), "reservations": len(reservation_docs)},
+    }
@@ -1,4 +1,4 @@
-from flask import Blueprint, jsonify, request, session, send_file
+from flask import Blueprint, Response, jsonify, request, session, send_file, stream_with_context
 from flask_pymongo import PyMongo
 from db import mongo 
 import bcrypt
@@ -7,16 +7,31 @@ from bson import ObjectId
 from datetime import datetime
 from datetime import datetime
 from werkzeug.utils import secure_filename
+from werkzeug.wsgi import wrap_file
 import gridfs
-import io
-import os
+import logging
+from utils.availability import availability
+from utils.enrichment import load_related, lookup
+from utils.dates import iso_date
+from utils.pagination import fetch_page, page_response, requested_projection
+from utils.export import CSV_COLUMNS, EXPORT_BATCH_SIZE, csv_lines, iter_batches, ndjson_lines
+from utils.images import IMAGE_VARIANTS, delete_image, preferred_format, store_image, variant_id
+from utils.image_cache import image_cache
+from utils.instrumentation import metrics
+from utils.profiler import profiler
+from utils.stats import counters
+from utils.response_cache import CLIENTS, RESERVATIONS, VOITURES
+from utils.versions import conditional, versions
 
 
 admin_bp = Blueprint('admin', __name__) 
+logger = logging.getLogger(__name__)
+
 def get_gridfs():
     return gridfs.GridFS(mongo.db)
 
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
+IMAGE_MAX_AGE = 365 * 24 * 3600
 CARBURANT_TYPES = ['Essence', 'Diesel', 'Hybride', 'Electrique', 'GPL']
 OPTIONS_LIST = ['GPS', 'Climatisation', 'Bluetooth', 'Caméra de recul', 
                'Sièges chauffants', 'Toit ouvrant', 'Régulateur de vitesse', 
@@ -67,10 +82,8 @@ def dashboard():
 
 @admin_bp.route('/admin/managers', methods=['GET'])
 def get_managers():
-    managers = list(mongo.db.managers.find())
-    for manager in managers:
-        manager['_id'] = str(manager['_id'])
-    return jsonify(managers)
+    managers, next_cursor = fetch_page(mongo.db.managers, projection=requested_projection())
+    return page_response(managers, next_cursor)
 @admin_bp.route('/admin/managers', methods=['POST'])
 def add_manager():
     data = request.get_json()
@@ -134,18 +147,16 @@ def delete_manager(id):
 
     return jsonify({'message': 'Manager supprimé avec succès'})
 
-@admin_bp.route('/admin/reservations', methods=['GET'])
-def get_reservations():
-    reservations = list(mongo.db.reservations.find())
+def enrich_reservations(reservations):
+    """Remplace client_id / voiture_id par un resume et met les dates en ISO."""
+    clients, voitures = load_related(reservations, ['nom', 'prenom'], ['marque', 'modele'])
     for res in reservations:
-        res['_id'] = str(res['_id'])
-
         # Fetch client details
         if 'client_id' in res:
-            client = mongo.db.clients.find_one({"_id": ObjectId(res['client_id'])})
+            client = lookup(clients, res['client_id'])
             if client:
                 res['client_id'] = {
-                    "_id": str(client['_id']),
+                    "_id": client['_id'],
                     "nom": client.get('nom', ''),
                     "prenom": client.get('prenom', '')
                 }
@@ -154,41 +165,71 @@ def get_reservations():
 
         # Fetch vehicle details
         if 'voiture_id' in res:
-            voiture = mongo.db.voitures.find_one({"_id": ObjectId(res['voiture_id'])})
+            voiture = lookup(voitures, res['voiture_id'])
             if voiture:
                 res['voiture_id'] = {
-                    "_id": str(voiture['_id']),
+                    "_id": voiture['_id'],
                     "marque": voiture.get('marque', ''),
                     "modele": voiture.get('modele', '')
                 }
             else:
                 res['voiture_id'] = None
 
-        # Convert string dates to ISO format
-        res['date_debut'] = (
-            datetime.strptime(res['date_debut'], "%Y-%m-%d").isoformat()
-            if res.get('date_debut') else None
-        )
-        res['date_fin'] = (
-            datetime.strptime(res['date_fin'], "%Y-%m-%d").isoformat()
-            if res.get('date_fin') else None
-        )
-        res['date_reservation'] = (
-            datetime.strptime(res['date_reservation'], "%Y-%m-%d").isoformat()
-            if res.get('date_reservation') else None
-        )
-    return jsonify(reservations)
+        # Convert dates to ISO format
+        res['date_debut'] = iso_date(res.get('date_debut'))
+        res['date_fin'] = iso_date(res.get('date_fin'))
+        res['date_reservation'] = iso_date(res.get('date_reservation'))
+    return reservations
+
+
+@admin_bp.route('/admin/reservations', methods=['GET'])
+@conditional(RESERVATIONS, CLIENTS, VOITURES)
+def get_reservations():
+    reservations = list(mongo.db.reservations.find())
+    return jsonify(enrich_reservations(reservations))
+
+@admin_bp.route('/admin/export/<collection>', methods=['GET'])
+@login_required
+def export_collection(collection):
+    if collection not in CSV_COLUMNS:
+        return jsonify({"error": f"Export disponible pour: {', '.join(CSV_COLUMNS)}"}), 404
+
+    export_format = request.args.get('format', 'ndjson').lower()
+    if export_format not in ('ndjson', 'csv'):
+        return jsonify({"error": "Format invalide. Options: ndjson, csv"}), 400
+
+    # Lecture par batchs: la memoire reste constante quelle que soit la taille
+    cursor = mongo.db[collection].find().batch_size(EXPORT_BATCH_SIZE)
+    batches = iter_batches(cursor)
+    if collection == 'reservations':
+        batches = (enrich_reservations(batch) for batch in batches)
+
+    if export_format == 'csv':
+        body, mimetype = csv_lines(batches, CSV_COLUMNS[collection]), 'text/csv'
+    else:
+        body, mimetype = ndjson_lines(batches), 'application/x-ndjson'
+
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={collection}.{export_format}"}
+    )
 
 @admin_bp.route('/admin/clients', methods=['GET'])
 def get_clients():
-    clients = list(mongo.db.clients.find())
+    clients, next_cursor = fetch_page(mongo.db.clients, projection=requested_projection())
     for client in clients:
-        client['_id'] = str(client['_id'])
-   
-        client['date_expiration'] = client['date_expiration'].isoformat() if 'date_expiration' in client else None
-        client['date_ajout'] = client['date_ajout'].isoformat() if 'date_ajout' in client else None
-    return jsonify(clients)
+        client.setdefault('date_expiration', None)
+        client.setdefault('date_ajout', None)
+    return page_response(clients, next_cursor)
+
+
 
+def set_image_cache_headers(response, etag):
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = IMAGE_MAX_AGE
+    response.cache_control.immutable = True
 
 
 def allowed_file(filename):
@@ -222,16 +263,12 @@ def validate_voiture_data(data):
     return errors
 
 @admin_bp.route('/admin/voiture', methods=['GET'])
+@conditional(VOITURES)
 def get_voitures():
-    voitures = []
-    for voiture in mongo.db.voitures.find():
-        voiture['_id'] = str(voiture['_id'])
-        if 'image_id' in voiture and voiture['image_id']:
-            voiture['image_id'] = str(voiture['image_id'])
-        else:
-            voiture['image_id'] = None
-        voitures.append(voiture)
-    return jsonify(voitures)
+    voitures, next_cursor = fetch_page(mongo.db.voitures, projection=requested_projection())
+    for voiture in voitures:
+        voiture['image_id'] = voiture.get('image_id') or None
+    return page_response(voitures, next_cursor)
 
 @admin_bp.route('/admin/voiture', methods=['POST'])
 def add_voiture():
@@ -250,11 +287,7 @@ def add_voiture():
     fs = get_gridfs()  # Initialisation de GridFS ici
     image_id = None
     if file and allowed_file(file.filename):
-        image_id = fs.put(
-            file.read(),
-            filename=secure_filename(file.filename),
-            content_type=file.content_type
-        )
+        image_id = store_image(fs, file, secure_filename(file.filename))
 
     voiture = {
         "marque": data['marque'],
@@ -274,29 +307,118 @@ def add_voiture():
     if image_id:
         voiture['image_id'] = image_id
 
-    result = mongo.db.voitures.insert_one(voiture)
-    voiture['_id'] = str(result.inserted_id)
-    if 'image_id' in voiture:
-        voiture['image_id'] = str(voiture['image_id'])
+    mongo.db.voitures.insert_one(voiture)
+    counters.increment("total_cars")
+    versions.bump(VOITURES)
     
     return jsonify(voiture), 201
 
 @admin_bp.route('/admin/image/<image_id>')
 def get_image(image_id):
+    if not image_id or image_id == 'undefined' or not ObjectId.is_valid(image_id):
+        return jsonify({"error": "Invalid image ID"}), 400
+
+    size = request.args.get('size')
+    if size and size not in IMAGE_VARIANTS:
+        return jsonify({"error": f"Taille invalide. Options: {', '.join(IMAGE_VARIANTS)}"}), 400
+    variant_format = preferred_format(request.accept_mimetypes) if size else None
+
+    # update_voiture cree un nouveau fichier GridFS a chaque remplacement:
+    # l'id ne designe jamais deux contenus differents et sert d'ETag fort
+    etag = f"{image_id}-{size}.{variant_format}" if size else image_id
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        set_image_cache_headers(response, etag)
+        return response
+
+    cache_key = f"{image_id}-{size}-{variant_format}" if size else image_id
+    cached_path = image_cache.get(cache_key) if image_cache.enabled else None
+    if cached_path:
+        return send_cached_image(cached_path, etag, size)
+
     try:
-        if not image_id or image_id == 'undefined':
-            return jsonify({"error": "Invalid image ID"}), 400
-        
-        fs = get_gridfs() 
+        fs = get_gridfs()
         image_data = fs.get(ObjectId(image_id))
-        return send_file(
-            io.BytesIO(image_data.read()),
-            mimetype=image_data.content_type,
-            as_attachment=False
-        )
-    except Exception as e:
-        print(f"Error retrieving image: {str(e)}")
+        if size:
+            # Images anterieures aux variantes: on sert l'original
+            resized_id = variant_id(image_data, size, variant_format)
+            if resized_id:
+                image_data = fs.get(resized_id)
+    except gridfs.errors.NoFile:
         return jsonify({"error": "Image not found"}), 404
+    except Exception:
+        logger.exception("Error retrieving image", extra={"image_id": image_id})
+        return jsonify({"error": "Image not found"}), 404
+
+    if image_cache.enabled:
+        try:
+            cached_path = image_cache.put(cache_key, image_data)
+        except OSError:
+            logger.warning("Error caching image", exc_info=True, extra={"image_id": image_id})
+            cached_path = None
+        if cached_path:
+            return send_cached_image(cached_path, etag, size)
+        image_data.seek(0)
+
+    # Lecture chunk par chunk depuis GridFS, sans charger le fichier en memoire
+    response = Response(
+        wrap_file(request.environ, image_data, buffer_size=image_data.chunk_size),
+        mimetype=image_data.content_type or 'application/octet-stream',
+        direct_passthrough=True
+    )
+    response.content_length = image_data.length
+    response.last_modified = image_data.upload_date
+    set_image_cache_headers(response, etag)
+    if size:
+        response.vary.add('Accept')
+    return response.make_conditional(request, accept_ranges=True, complete_length=image_data.length)
+
+
+def send_cached_image(path, etag, size):
+    # send_file passe par wsgi.file_wrapper (sendfile) et gere Range / If-None-Match
+    response = send_file(path, etag=etag, max_age=IMAGE_MAX_AGE, conditional=True)
+    set_image_cache_headers(response, etag)
+    if size:
+        response.vary.add('Accept')
+    return response
+
+
+@admin_bp.route('/admin/image-cache/stats', methods=['GET'])
+def image_cache_stats():
+    return jsonify(image_cache.stats())
+
+
+@admin_bp.route('/admin/metrics', methods=['GET'])
+@login_required
+def get_metrics():
+    # Histogrammes du worker qui repond (?format=prometheus pour le format texte)
+    if request.args.get('format') == 'prometheus':
+        return Response(metrics.prometheus(), mimetype='text/plain; version=0.0.4')
+    return jsonify(metrics.snapshot())
+
+
+@admin_bp.route('/admin/profiles', methods=['GET'])
+@login_required
+def get_profiles():
+    return jsonify({"profiles": profiler.summaries()})
+
+
+@admin_bp.route('/admin/profiles/collapsed', methods=['GET'])
+@login_required
+def get_profiles_collapsed():
+    # Piles fusionnees de tous les profils, ou d'une route (?route=/manager/reservations)
+    return Response(profiler.collapsed(route=request.args.get('route')), mimetype='text/plain')
+
+
+@admin_bp.route('/admin/profiles/<profile_id>', methods=['GET'])
+@login_required
+def get_profile(profile_id):
+    if not ObjectId.is_valid(profile_id):
+        return jsonify({"error": "Profile not found"}), 404
+    collapsed = profiler.collapsed(profile_id=profile_id)
+    if not collapsed:
+        return jsonify({"error": "Profile not found"}), 404
+    return Response(collapsed, mimetype='text/plain')
     
     
 @admin_bp.route('/admin/voiture/<id>', methods=['PUT'])
@@ -336,16 +458,13 @@ def update_voiture(id):
             voiture = mongo.db.voitures.find_one({"_id": ObjectId(id)})
             if voiture and 'image_id' in voiture and voiture['image_id']:
                 try:
-                    fs.delete(ObjectId(voiture['image_id']))
-                except Exception as e:
-                    print(f"Error deleting old image: {str(e)}")
+                    delete_image(fs, voiture['image_id'])
+                    image_cache.invalidate(voiture['image_id'])
+                except Exception:
+                    logger.warning("Error deleting old image", exc_info=True)
             
-            # Ajouter la nouvelle image
-            image_id = fs.put(
-                file.read(),
-                filename=secure_filename(file.filename),
-                content_type=file.content_type
-            )
+            # Ajouter la nouvelle image (et ses variantes)
+            image_id = store_image(fs, file, secure_filename(file.filename))
             update_data['image_id'] = image_id
 
         result = mongo.db.voitures.update_one(
@@ -358,12 +477,10 @@ def update_voiture(id):
         
         if result.modified_count == 0:
             return jsonify({"message": "Aucune modification nécessaire", "voiture_id": id}), 200
+        versions.bump(VOITURES)
         
         # Récupérer la voiture mise à jour pour la réponse
         updated_voiture = mongo.db.voitures.find_one({"_id": ObjectId(id)})
-        updated_voiture['_id'] = str(updated_voiture['_id'])
-        if 'image_id' in updated_voiture:
-            updated_voiture['image_id'] = str(updated_voiture['image_id'])
         
         return jsonify({
             "message": "Voiture mise à jour avec succès",
@@ -371,7 +488,7 @@ def update_voiture(id):
         }), 200
 
     except Exception as e:
-        print(f"Error updating voiture: {str(e)}")
+        logger.exception("Error updating voiture", extra={"voiture_id": id})
         return jsonify({
             "error": "Erreur lors de la mise à jour de la voiture",
             "details": str(e)
@@ -384,12 +501,16 @@ def delete_voiture(id):
     
     if 'image_id' in voiture and voiture['image_id']:
         try:
-            fs.delete(ObjectId(voiture['image_id']))
-        except Exception as e:
-            print(f"Error deleting image: {str(e)}")
+            delete_image(get_gridfs(), voiture['image_id'])
+            image_cache.invalidate(voiture['image_id'])
+        except Exception:
+            logger.warning("Error deleting image", exc_info=True)
     
     result = mongo.db.voitures.delete_one({"_id": ObjectId(id)})
     if result.deleted_count == 0:
         return jsonify({"error": "Échec de la suppression"}), 400
+    availability.release_car(id)
+    counters.increment("total_cars", -1)
+    versions.bump(VOITURES)
     
     return jsonify({"message": "Voiture supprimée"})
\ No newline at end of file
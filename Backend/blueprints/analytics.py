@@ -0,0 +1,99 @@
+from flask import Blueprint, current_app, jsonify, request
+from db import mongo
+from utils.analytics import REVENUE_GROUPS, default_period, rental_length, revenue, top_clients, utilization
+from utils.dates import to_datetime
+from utils.enrichment import fetch_by_ids
+from utils.pagination import requested_limit
+
+analytics_bp = Blueprint('analytics', __name__)
+
+
+def requested_period(required=False):
+    """(debut, fin) depuis ?from=&to= (YYYY-MM-DD); ValueError si invalide.
+
+    Sans parametres: (None, None), ou les 30 derniers jours si `required`.
+    """
+    start, end = request.args.get('from'), request.args.get('to')
+    if not start and not end:
+        return default_period() if required else (None, None)
+
+    start_date = to_datetime(start) if start else None
+    end_date = to_datetime(end) if end else None
+    if (start and not start_date) or (end and not end_date):
+        raise ValueError("Invalid from or to date")
+    if required and (not start_date or not end_date):
+        raise ValueError("Both from and to are required")
+    if start_date and end_date and end_date < start_date:
+        raise ValueError("to is before from")
+    return start_date, end_date
+
+
+def use_rollup():
+    """?source=rollup|live, sinon ANALYTICS_USE_ROLLUP."""
+    source = request.args.get('source')
+    if source:
+        return source == 'rollup'
+    return current_app.config.get('ANALYTICS_USE_ROLLUP', False)
+
+
+@analytics_bp.route('/admin/analytics/revenue', methods=['GET'])
+def revenue_view():
+    group = request.args.get('group', 'month')
+    if group not in REVENUE_GROUPS:
+        return jsonify({"error": f"Invalid group. Options: {', '.join(REVENUE_GROUPS)}"}), 400
+    try:
+        start, end = requested_period()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    rows = revenue(group, start, end, use_rollup())
+    if group == 'car':
+        cars = fetch_by_ids(mongo.db.voitures, [row['key'] for row in rows], {'marque': 1, 'modele': 1, 'immatriculation': 1})
+        for row in rows:
+            car = cars.get(row['key']) or {}
+            row['label'] = f"{car.get('marque', '')} {car.get('modele', '')}".strip() or "Unknown"
+            row['immatriculation'] = car.get('immatriculation')
+
+    return jsonify({"group": group, "total": sum(row['revenue'] for row in rows), "rows": rows})
+
+
+@analytics_bp.route('/admin/analytics/utilization', methods=['GET'])
+def utilization_view():
+    try:
+        start, end = requested_period(required=True)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"from": start, "to": end, **utilization(start, end)})
+
+
+@analytics_bp.route('/admin/analytics/rental-length', methods=['GET'])
+def rental_length_view():
+    try:
+        start, end = requested_period()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(rental_length(start, end, use_rollup()))
+
+
+@analytics_bp.route('/admin/analytics/top-clients', methods=['GET'])
+def top_clients_view():
+    try:
+        start, end = requested_period()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"clients": top_clients(start, end, requested_limit(10, 100))})
+
+
+@analytics_bp.route('/admin/analytics/daily', methods=['GET'])
+def daily_view():
+    """Snapshots quotidiens precalcules (flask snapshot-days ou flask run-jobs)."""
+    try:
+        start, end = requested_period(required=True)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    days = list(mongo.db.daily_snapshots.find(
+        {"_id": {"$gte": start, "$lte": end}}, {"computed_at": 0}
+    ).sort("_id", 1))
+    for day in days:
+        day["day"] = day.pop("_id")
+    return jsonify({"from": start, "to": end, "days": days})
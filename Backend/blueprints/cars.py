@@ -1,26 +1,136 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
+from werkzeug.exceptions import HTTPException
 import json
 from bson import ObjectId
 from models.voiture_model import Voiture
 from db import mongo
+from utils.pagination import fetch_page, page_response, requested_limit, requested_page, requested_projection
+from utils.response_cache import VOITURES, response_cache
+from utils.versions import conditional
 
 voiture_bp = Blueprint('voiture', __name__)
 
+# Tris proposes par CarListings; _id departage les ex aequo pour une pagination stable
+SEARCH_SORTS = {
+    'price-asc': {'prix_journalier': 1, '_id': 1},
+    'price-desc': {'prix_journalier': -1, '_id': 1},
+    'newest': {'date_ajout': -1, '_id': 1},
+    'oldest': {'date_ajout': 1, '_id': 1},
+}
+
+
+def list_arg(name):
+    """Valeurs repetees (?x=a&x=b) ou separees par des virgules (?x=a,b)."""
+    return [value.strip() for raw in request.args.getlist(name) for value in raw.split(',') if value.strip()]
+
+
+def search_filter():
+    """Filtre Mongo construit depuis les parametres de /cars/search (ValueError si invalide)."""
+    query = {}
+
+    price = {}
+    if request.args.get('prix_min'):
+        price['$gte'] = float(request.args['prix_min'])
+    if request.args.get('prix_max'):
+        price['$lte'] = float(request.args['prix_max'])
+    if price:
+        query['prix_journalier'] = price
+
+    fuels = list_arg('type_carburant')
+    if fuels:
+        query['type_carburant'] = {'$in': fuels}
+
+    # Toutes les options demandees doivent etre presentes
+    options = list_arg('options')
+    if options:
+        query['options'] = {'$all': options}
+
+    places = list_arg('nombre_places')
+    if places:
+        query['nombre_places'] = {'$in': [int(p) for p in places]}
+
+    return query
+
+
 @voiture_bp.route('/', methods=['GET'])
+@conditional(VOITURES)
+@response_cache.cached(VOITURES)
 def get_all_cars():
     try:
-        voitures = mongo.db.voitures.find()
-        result = []
-        for voiture in voitures:
-            voiture['_id'] = str(voiture['_id'])  # Convert ObjectId to string
-            if 'date_ajout' in voiture:
-                voiture['date_ajout'] = voiture['date_ajout'].isoformat()  # Convert date to ISO string
-            result.append(voiture)
-        return jsonify(result), 200
+        voitures, next_cursor = fetch_page(mongo.db.voitures, projection=requested_projection())
+        return page_response(voitures, next_cursor), 200
+    except HTTPException:
+        raise
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@voiture_bp.route('/cars/search', methods=['GET'])
+@conditional(VOITURES)
+@response_cache.cached(VOITURES)
+def search_cars():
+    try:
+        query = search_filter()
+    except ValueError:
+        return jsonify({'error': 'Invalid search parameters'}), 400
+
+    sort = SEARCH_SORTS.get(request.args.get('sort', 'price-asc'))
+    if sort is None:
+        return jsonify({'error': f"Invalid sort. Options: {', '.join(SEARCH_SORTS)}"}), 400
+    page, limit = requested_page(), requested_limit()
+
+    items = [{'$sort': sort}, {'$skip': (page - 1) * limit}, {'$limit': limit}]
+    projection = requested_projection()
+    if projection:
+        items.append({'$project': projection})
+
+    # Chaque facette est comptee sans son propre filtre: le carburant choisi
+    # n'efface pas les autres carburants, qui restent proposes avec leur nombre
+    fuel_filter = {'type_carburant': query.pop('type_carburant')} if 'type_carburant' in query else {}
+    options_filter = {'options': query.pop('options')} if 'options' in query else {}
+    facets = {
+        'type_carburant': [{'$group': {'_id': '$type_carburant', 'count': {'$sum': 1}}}],
+        'options': [{'$unwind': '$options'}, {'$group': {'_id': '$options', 'count': {'$sum': 1}}}],
+    }
+
+    try:
+        # Resultats et total sous le $match indexe complet, en un seul aller-retour avec
+        # les facettes dont le filtre n'est pas utilise
+        stages = {'items': items, 'total': [{'$count': 'count'}]}
+        if not fuel_filter:
+            stages['type_carburant'] = facets['type_carburant']
+        if not options_filter:
+            stages['options'] = facets['options']
+        result = next(mongo.db.voitures.aggregate([
+            {'$match': {**query, **fuel_filter, **options_filter}},
+            {'$facet': stages},
+        ]))
+
+        # Facette filtree: un second $match indexe, sans son propre filtre
+        if fuel_filter:
+            result['type_carburant'] = list(mongo.db.voitures.aggregate(
+                [{'$match': {**query, **options_filter}}] + facets['type_carburant']
+            ))
+        if options_filter:
+            result['options'] = list(mongo.db.voitures.aggregate(
+                [{'$match': {**query, **fuel_filter}}] + facets['options']
+            ))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+    return jsonify({
+        'items': result['items'],
+        'total': result['total'][0]['count'] if result['total'] else 0,
+        'page': page,
+        'limit': limit,
+        'facets': {
+            'type_carburant': {facet['_id']: facet['count'] for facet in result['type_carburant']},
+            'options': {facet['_id']: facet['count'] for facet in result['options']},
+        }
+    }), 200
+
 @voiture_bp.route('/cars/<string:car_id>', methods=['GET'])
+@conditional(VOITURES)
+@response_cache.cached(VOITURES)
 def get_car(car_id):
     try:
         # Validate ObjectId format first
@@ -32,11 +142,6 @@ def get_car(car_id):
         if not car:
             return jsonify({'error': 'Car not found'}), 404
 
-        # Convert ObjectId and handle dates
-        car['_id'] = str(car['_id'])
-        if 'date_ajout' in car:
-            car['date_ajout'] = car['date_ajout'].isoformat() if car['date_ajout'] else None
-            
         return jsonify(car), 200
 
     except Exception as e:
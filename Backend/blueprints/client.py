@@ -1,11 +1,10 @@
 from flask import Blueprint, jsonify
 from db import mongo
+from utils.pagination import fetch_page, page_response, requested_projection
 
 client_bp = Blueprint('client', __name__)
 
 @client_bp.route('/clients', methods=['GET'])
 def get_clients():
-    clients = list(mongo.db.clients.find())
-    for client in clients:
-        client['_id'] = str(client['_id'])  
-    return jsonify(clients)
+    clients, next_cursor = fetch_page(mongo.db.clients, projection=requested_projection())
+    return page_response(clients, next_cursor)
@@ -7,6 +7,7 @@ import json
 from bson import ObjectId
 from models.manager_model import Manager
 from db import mongo
+from utils.stats import counters
 
 app = Flask(__name__)
 CORS(app)
@@ -18,12 +19,11 @@ mongo = PyMongo(app)
 
 @stats_bp.route("/stats", methods=["GET"])
 def get_stats():
-    total_voitures = mongo.db.voitures.count_documents({})
-    total_clients = mongo.db.clients.count_documents({})
+    stats = counters.snapshot()
 
     return jsonify({
-        "total_voitures": total_voitures,
-        "total_clients": total_clients
+        "total_voitures": stats["total_cars"],
+        "total_clients": stats["total_clients"]
     })
 
 if __name__ == "__main__":
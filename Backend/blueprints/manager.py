@@ -1,10 +1,39 @@
 from flask import Blueprint, request, jsonify
 from db import mongo
 import bcrypt
+import logging
+import re
 from bson import ObjectId
 from datetime import datetime
+from utils.enrichment import fetch_by_ids, load_related, lookup
+from utils.names import name_key, name_keys
+from utils.availability import ACTIVE_STATUSES, availability
+from utils.booking import BookingError, book
+from utils.stats import counters
+from utils.dates import format_date, to_date, to_datetime, today
+from utils.pagination import fetch_page, page_response, requested_limit
+from utils.response_cache import CLIENTS, RESERVATIONS, VOITURES
+from utils.snapshots import PAID
+from utils.versions import conditional, versions
 
 manager_bp = Blueprint('manager', __name__)
+logger = logging.getLogger(__name__)
+
+CLIENT_PROJECTION = {
+    "_id": 1,
+    "nom": 1,
+    "prenom": 1,
+    "email": 1,
+    "telephone": 1,
+    "adresse": 1,
+    "CIN": 1,
+    "permis_conduire": 1,
+    "numero_permis": 1,
+}
+CLIENT_SEARCH_LIMIT = 20
+CLIENT_SEARCH_MAX_LIMIT = 100
+# Fenetre maximale du calendrier (?from=...&to=...)
+CALENDAR_MAX_DAYS = 366
 
 
 # bd config
@@ -22,62 +51,41 @@ manager_bp = Blueprint('manager', __name__)
 @manager_bp.route('/managers', methods=['GET'])
 def get_managers():
     managers = list(mongo.db.managers.find())
-    for manager in managers:
-        manager['_id'] = str(manager['_id'])
     return jsonify(managers)
 
 # Stat manager
 @manager_bp.route("/manager/dashboard/stats", methods=["GET"])
 def dashboard_stats():
-    reservations_collection = mongo.db.reservations
-    cars_collection = mongo.db.voitures
-    now = datetime.now()
-    total_reservations = reservations_collection.count_documents({})
-    reserved_car_ids = reservations_collection.distinct("voiture_id", {
-        "date_debut": {"$lte": now},
-        "date_fin": {"$gte": now}
-    })
-
-    total_cars = cars_collection.count_documents({})
-    available_cars = total_cars - len(reserved_car_ids)
-
-    active_client_ids = reservations_collection.distinct("client_id", {
-        "date_fin": {"$gte": now.strftime("%Y-%m-%d")},  # Compare as string
-        "statut": {"$in": ["acceptée", "en attente"]}  # IncFude only active reservations
-    })
-    active_clients = len(active_client_ids)
+    # Compteurs materialises (voir utils/stats.py)
+    stats = counters.snapshot()
 
     return jsonify({
-        "totalReservations": total_reservations,
-        "availableCars": available_cars,
-        "activeClients": active_clients
+        "totalReservations": stats["total_reservations"],
+        "availableCars": stats["total_cars"] - stats["rented_cars"],
+        "activeClients": stats["active_clients"]
     })
 
 
 # Les Reservations Endpoint
 @manager_bp.route("/manager/dashboard/upcoming-reservations", methods=["GET"])
+@conditional(RESERVATIONS, CLIENTS, VOITURES, daily=True)
 def upcoming_reservations():
-    now = datetime.now()
     reservations = list(mongo.db.reservations.find(
-        {"date_debut": {"$gte": now.strftime("%Y-%m-%d")}},  # Compare as string
+        {"date_debut": {"$gte": today()}},
         {"_id": 0, "client_id": 1, "voiture_id": 1, "date_debut": 1, "statut": 1}
     ).sort("date_debut", 1))
 
+    clients, cars = load_related(reservations, ["nom", "prenom"], ["marque", "modele"])
+
     enriched_reservations = []
     for reservation in reservations:
-        client = mongo.db.clients.find_one(
-            {"_id": reservation["client_id"]},
-            {"_id": 0, "nom": 1, "prenom": 1}
-        )
-        car = mongo.db.voitures.find_one(
-            {"_id": reservation["voiture_id"]},
-            {"_id": 0, "marque": 1, "modele": 1}
-        )
+        client = lookup(clients, reservation.get("client_id"))
+        car = lookup(cars, reservation.get("voiture_id"))
 
         enriched_reservations.append({
             "clientName": f"{client['prenom']} {client['nom']}" if client else "Unknown",
             "carModel": f"{car['marque']} {car['modele']}" if car else "Unknown",
-            "startDate": reservation["date_debut"],  # Use the string directly
+            "startDate": format_date(reservation["date_debut"]),
             "status": reservation["statut"]
         })
 
@@ -86,8 +94,9 @@ def upcoming_reservations():
 
 # Tout les Reservations
 @manager_bp.route("/manager/reservations", methods=["GET"])
+@conditional(RESERVATIONS, CLIENTS, VOITURES)
 def get_reservations():
-    reservations = list(mongo.db.reservations.find({}, {
+    reservations, next_cursor = fetch_page(mongo.db.reservations, projection={
         "_id": 1,
         "client_id": 1,
         "voiture_id": 1,
@@ -97,20 +106,20 @@ def get_reservations():
         "prix_total": 1,
         "paiement": 1,  
         "date_reservation": 1
-    }))
+    })
+    clients, cars = load_related(
+        reservations,
+        ["nom", "prenom", "email", "telephone"],
+        ["marque", "modele"]
+    )
+
     enriched_reservations = []
     for reservation in reservations:
-        client = mongo.db.clients.find_one(
-            {"_id": reservation["client_id"]},
-            {"_id": 0, "nom": 1, "prenom": 1, "email": 1, "telephone": 1}
-        )
-        car = mongo.db.voitures.find_one(
-            {"_id": reservation["voiture_id"]},
-            {"_id": 0, "marque": 1, "modele": 1}
-        )
+        client = lookup(clients, reservation.get("client_id"))
+        car = lookup(cars, reservation.get("voiture_id"))
 
         enriched_reservations.append({
-            "_id": str(reservation["_id"]),
+            "_id": reservation["_id"],
             "client": {
                 "name": f"{client['prenom']} {client['nom']}" if client else "Unknown",
                 "email": client["email"] if client else "Unknown",
@@ -119,15 +128,15 @@ def get_reservations():
             "car": {
                 "model": f"{car['marque']} {car['modele']}" if car else "Unknown"
             },
-            "date_debut": reservation["date_debut"],
-            "date_fin": reservation["date_fin"],
+            "date_debut": format_date(reservation["date_debut"]),
+            "date_fin": format_date(reservation["date_fin"]),
             "statut": reservation["statut"],
             "prix_total": reservation["prix_total"],
             "paiement": reservation.get("paiement", {"statut": "non payée"}),
-            "date_reservation": reservation.get("date_reservation")
+            "date_reservation": format_date(reservation.get("date_reservation"))
         })
 
-    return jsonify(enriched_reservations)
+    return page_response(enriched_reservations, next_cursor)
 
 
 # Reservation by ID
@@ -151,38 +160,27 @@ def get_reservation(reservation_id):
     )
 
     return jsonify({
-        "id": str(reservation["_id"]),
-        "clientId": str(reservation["client_id"]),
-        "carId": str(reservation["voiture_id"]),
+        "id": reservation["_id"],
+        "clientId": reservation["client_id"],
+        "carId": reservation["voiture_id"],
         "clientName": f"{client['prenom']} {client['nom']}" if client else "Unknown",
         "carModel": f"{car['marque']} {car['modele']}" if car else "Unknown",
-        "startDate": reservation["date_debut"],
-        "endDate": reservation["date_fin"],
+        "startDate": format_date(reservation["date_debut"]),
+        "endDate": format_date(reservation["date_fin"]),
         "status": reservation["statut"],
         "totalAmount": reservation["prix_total"]
     })
 
 # Tout les voitures 
 @manager_bp.route("/manager/cars", methods=["GET"])
+@conditional(VOITURES, RESERVATIONS, daily=True)
 def get_cars():
     cars = list(mongo.db.voitures.find())
-    now = datetime.now()
+    busy = availability.busy_cars(today())
 
     for car in cars:
-        car_id = car["_id"]
-
         # Check if there is an active reservation for this car
-        active_res = mongo.db.reservations.find_one({
-            "voiture_id": car_id,
-            "date_debut": {"$lte": now.strftime("%Y-%m-%d")},
-            "date_fin": {"$gte": now.strftime("%Y-%m-%d")},
-            "statut": {"$in": ["acceptée", "en attente"]}
-        })
-
-        car["status"] = "indisponible" if active_res else "disponible"
-        car["_id"] = str(car["_id"])
-        if "date_ajout" in car and hasattr(car["date_ajout"], "isoformat"):
-            car["date_ajout"] = car["date_ajout"].isoformat()
+        car["status"] = "indisponible" if str(car["_id"]) in busy else "disponible"
 
     return jsonify({"cars": cars})
 
@@ -196,96 +194,172 @@ def get_available_cars():
         if not start or not end:
             return jsonify({"error": "Missing start or end date"}), 400
 
-        start_date = start.split("T")[0]  # Extract only the date part
-        end_date = end.split("T")[0] 
+        start_date = to_date(start)
+        end_date = to_date(end)
+        if not start_date or not end_date:
+            return jsonify({"error": "Invalid start or end date"}), 400
 
-        # Get list of car IDs that are reserved in the given date range
-        reserved_car_ids = mongo.db.reservations.distinct("voiture_id", {
-            "date_debut": {"$lte": end_date},
-            "date_fin": {"$gte": start_date},
-            "statut": {"$in": ["acceptée", "en attente"]}
-        })
-
-        # Find all cars not in the reserved list
-        available_cars = list(mongo.db.voitures.find({
-            "_id": {"$nin": reserved_car_ids}
-        }))
-
-        for car in available_cars:
-            car["_id"] = str(car["_id"])
-            if "date_ajout" in car and hasattr(car["date_ajout"], "isoformat"):
-                car["date_ajout"] = car["date_ajout"].isoformat()
+        # Keep only cars with no active reservation in the given date range
+        busy = availability.busy_cars(start_date, end_date)
+        available_cars = list(mongo.db.voitures.find({"_id": {"$nin": [ObjectId(car_id) for car_id in busy]}}))
 
         return jsonify({"cars": available_cars}), 200
 
     except Exception as e:
-        print("Error fetching available cars:", str(e))
+        logger.exception("Error fetching available cars")
         return jsonify({"error": "Failed to fetch available cars", "details": str(e)}), 500
 
 
 # Calendrie (Pedagoquique hihi)
 @manager_bp.route("/manager/calendar/reservations", methods=["GET"])
+@conditional(RESERVATIONS, CLIENTS, VOITURES)
 def calendar_reservations():
+    query = {}
+    start, end = request.args.get("from"), request.args.get("to")
+    if start or end:
+        start_date, end_date = to_datetime(start), to_datetime(end)
+        if not start_date or not end_date or end_date < start_date:
+            return jsonify({"error": "Invalid from or to date"}), 400
+        if (end_date - start_date).days > CALENDAR_MAX_DAYS:
+            return jsonify({"error": f"Window is limited to {CALENDAR_MAX_DAYS} days"}), 400
+        # Reservations qui chevauchent la fenetre (index date_fin_debut ou voiture_periode_statut)
+        query["date_debut"] = {"$lte": end_date}
+        query["date_fin"] = {"$gte": start_date}
+
+    car_id = request.args.get("car_id")
+    if car_id:
+        if not ObjectId.is_valid(car_id):
+            return jsonify({"error": "Invalid car ID"}), 400
+        query["voiture_id"] = ObjectId(car_id)
+
     try:
-        reservations = list(mongo.db.reservations.find({}, {
+        reservations = list(mongo.db.reservations.find(query, {
             "_id": 1,
             "client_id": 1,
             "voiture_id": 1,
             "date_debut": 1,
             "date_fin": 1,
             "statut": 1
-        }))
+        }).sort("date_debut", 1))
+
+        if request.args.get("format") == "timeline":
+            return jsonify(calendar_timeline(reservations)), 200
+
+        clients, cars = load_related(reservations, ["nom", "prenom"], ["marque", "modele"])
 
         enriched_reservations = []
         for reservation in reservations:
-            client = mongo.db.clients.find_one(
-                {"_id": reservation["client_id"]},
-                {"_id": 0, "nom": 1, "prenom": 1}
-            )
-            car = mongo.db.voitures.find_one(
-                {"_id": reservation["voiture_id"]},
-                {"_id": 0, "marque": 1, "modele": 1}
-            )
+            client = lookup(clients, reservation.get("client_id"))
+            car = lookup(cars, reservation.get("voiture_id"))
 
             enriched_reservations.append({
-                "id": str(reservation["_id"]),
+                "id": reservation["_id"],
                 "clientName": f"{client['prenom']} {client['nom']}" if client else "Unknown",
                 "carModel": f"{car['marque']} {car['modele']}" if car else "Unknown",
-                "startDate": reservation["date_debut"],
-                "endDate": reservation["date_fin"],
+                "startDate": format_date(reservation["date_debut"]),
+                "endDate": format_date(reservation["date_fin"]),
                 "status": reservation["statut"]
             })
 
         return jsonify({"reservations": enriched_reservations}), 200
 
-    except Exception as e:
-        print("Error fetching calendar reservations:", str(e))
+    except Exception:
+        logger.exception("Error fetching calendar reservations")
         return jsonify({"error": "Failed to fetch reservations"}), 500
 
 
+def calendar_timeline(reservations):
+    """Format compact: voiture -> [[debut, fin, statut], ...], plus le nom des voitures."""
+    timeline = {}
+    for reservation in reservations:
+        timeline.setdefault(str(reservation["voiture_id"]), []).append([
+            format_date(reservation["date_debut"]),
+            format_date(reservation["date_fin"]),
+            reservation["statut"]
+        ])
+
+    cars = fetch_by_ids(mongo.db.voitures, [r["voiture_id"] for r in reservations], {"marque": 1, "modele": 1})
+    return {
+        "timeline": timeline,
+        "cars": {str(car_id): f"{car.get('marque', '')} {car.get('modele', '')}".strip() for car_id, car in cars.items()}
+    }
+
+
 # Clients list
 @manager_bp.route("/manager/clients", methods=["GET"])
 def get_clients():
     try:
-        clients = list(mongo.db.clients.find({}, {
-            "_id": 1,
-            "nom": 1,
-            "prenom": 1,
-            "email": 1,
-            "telephone": 1,
-            "adresse": 1,
-            "CIN": 1,
-            "permis_conduire": 1,
-            "numero_permis": 1,
-        }))
-
-        for client in clients:
-            client["_id"] = str(client["_id"])
+        clients = list(mongo.db.clients.find({}, CLIENT_PROJECTION))
 
         return jsonify({"clients": clients}), 200
-    except Exception as e:
-        print("Error fetching clients:", str(e))
+    except Exception:
+        logger.exception("Error fetching clients")
         return jsonify({"error": "Failed to fetch clients"}), 500
+
+
+def identifier_queries(q):
+    """Filtres sur CIN, telephone, numero_permis et email: egalite puis prefixe ancre.
+
+    CIN et permis sont saisis en majuscules, les emails en minuscules.
+    Chaque branche du $or utilise l'index ascendant de son champ.
+    """
+    values = {
+        "CIN": q.upper(),
+        "telephone": q,
+        "numero_permis": q.upper(),
+        "email": q.lower(),
+    }
+    exact = {"$or": [{field: value} for field, value in values.items()]}
+    prefix = {"$or": [{field: {"$regex": "^" + re.escape(value)}} for field, value in values.items()]}
+    return exact, prefix
+
+
+def name_prefix_query(q):
+    """Debut de nom ou de prenom, sans tenir compte de la casse ("Benn" -> "Bennani").
+
+    $text ne trouve que des mots entiers; cette branche garde la recherche
+    partielle de l'ancien filtre cote client. Elle porte sur nom_lc et
+    prenom_lc (voir utils/names.py): un prefixe ancre, sensible a la casse,
+    borne le parcours de l'index.
+    """
+    pattern = {"$regex": "^" + re.escape(name_key(q))}
+    return {"$or": [{"nom_lc": pattern}, {"prenom_lc": pattern}]}
+
+
+# Recherche de clients au comptoir
+@manager_bp.route("/manager/clients/search", methods=["GET"])
+@conditional(CLIENTS)
+def search_clients():
+    q = request.args.get("q", "").strip()
+    if not q:
+        return jsonify({"error": "Missing search query"}), 400
+    limit = requested_limit(CLIENT_SEARCH_LIMIT, CLIENT_SEARCH_MAX_LIMIT)
+
+    try:
+        # Classement: identifiant exact, prefixe d'identifiant, debut de nom, puis pertinence texte
+        exact, prefix = identifier_queries(q)
+        text_projection = {**CLIENT_PROJECTION, "score": {"$meta": "textScore"}}
+        # Curseurs paresseux: une requete n'est envoyee que si les precedentes n'ont pas suffi
+        cursors = [
+            mongo.db.clients.find(exact, CLIENT_PROJECTION).limit(limit),
+            mongo.db.clients.find(prefix, CLIENT_PROJECTION).limit(limit),
+            mongo.db.clients.find(name_prefix_query(q), CLIENT_PROJECTION).sort("nom_lc", 1).limit(limit),
+            mongo.db.clients.find({"$text": {"$search": q}}, text_projection)
+                .sort([("score", {"$meta": "textScore"})]).limit(limit),
+        ]
+
+        clients = {}
+        for cursor in cursors:
+            for client in cursor:
+                client.pop("score", None)
+                clients.setdefault(client["_id"], client)
+            if len(clients) >= limit:
+                break
+
+        return jsonify({"clients": list(clients.values())[:limit]}), 200
+    except Exception:
+        logger.exception("Error searching clients")
+        return jsonify({"error": "Failed to search clients"}), 500
     
 ##------------------------------------------##
 
@@ -309,7 +383,7 @@ def add_manager():
 def add_reservation():
     try:
         data = request.json
-        print("Received data:", data)
+        logger.debug("Reservation payload", extra={"payload": data})
         client_id = ObjectId(data["clientId"])
         car_id = ObjectId(data["carId"])
         details = data["reservationDetails"]
@@ -317,21 +391,34 @@ def add_reservation():
         reservation = {
             "client_id": client_id,
             "voiture_id": car_id,
-            "date_debut": details["startDate"].split("T")[0],  # Save only the date part
-            "date_fin": details["endDate"].split("T")[0],    # Save only the date part
+            "date_debut": to_datetime(details["startDate"]),  # Save only the date part
+            "date_fin": to_datetime(details["endDate"]),
             "prix_total": details["totalAmount"],
             "discount": details.get("discount", 0),  
             "statut": "en attente",
-            "date_reservation": datetime.now().strftime("%Y-%m-%d"), 
+            "date_reservation": today(),
             "paiement": {
                 "methode": details["paymentMethod"],
                 "statut": details["paymentStatus"]
             }
         }
-        result = mongo.db.reservations.insert_one(reservation)
+        if details["paymentStatus"] == PAID:
+            reservation["paiement"]["date_paiement"] = today()
+        if not reservation["date_debut"] or not reservation["date_fin"]:
+            return jsonify({"error": "Invalid start or end date"}), 400
+        if reservation["date_fin"] < reservation["date_debut"]:
+            return jsonify({"error": "End date is before start date"}), 400
+
+        # Jours pris dans occupancy puis insertion, sous le verrou de la voiture
+        reservation["_id"] = ObjectId()
+        result = book(reservation, lambda: mongo.db.reservations.insert_one(reservation))
+        counters.increment("total_reservations")
+        versions.bump(RESERVATIONS)
         return jsonify({"message": "Reservation created successfully", "id": str(result.inserted_id)}), 201
+    except BookingError as e:
+        return jsonify({"error": e.message}), e.status_code
     except Exception as e:
-        print("Error:", str(e))
+        logger.exception("Error creating reservation")
         return jsonify({"error": "Failed to create reservation", "message": str(e)}), 500
     
 
@@ -355,16 +442,19 @@ def add_client():
             "CIN": data["CIN"],
             "permis_conduire": data["permis_conduire"],
             "numero_permis": data["numero_permis"],
+            **name_keys(data["nom"], data["prenom"]),
         }
 
         result = mongo.db.clients.insert_one(new_client)
+        counters.increment("total_clients")
+        versions.bump(CLIENTS)
         return jsonify({
             "message": "Client added successfully",
             "id": str(result.inserted_id)
         }), 201
 
     except Exception as e:
-        print("Error adding client:", str(e))
+        logger.exception("Error adding client")
         return jsonify({
             "error": "Failed to add client",
             "message": str(e)
@@ -391,15 +481,14 @@ def add_car():
             "image": data.get("image", ""),
         }
 
-        result = mongo.db.voitures.insert_one(car)
-
-        car["_id"] = str(result.inserted_id)
-        car["date_ajout"] = car["date_ajout"].isoformat()
+        mongo.db.voitures.insert_one(car)
+        counters.increment("total_cars")
+        versions.bump(VOITURES)
 
         return jsonify(car), 201
 
     except Exception as e:
-        print("Error adding car:", str(e))
+        logger.exception("Error adding car")
         return jsonify({
             "error": "Failed to add car",
             "message": str(e)
@@ -432,24 +521,41 @@ def update_reservation(reservation_id):
         updated_reservation = {
             "client_id": ObjectId(data["client_id"]),
             "voiture_id": ObjectId(data["car_id"]),
-            "date_debut": data["startDate"],
-            "date_fin": data["endDate"],
+            "date_debut": to_datetime(data["startDate"]),
+            "date_fin": to_datetime(data["endDate"]),
             "statut": data["status"],
+            "date_statut": today(),
             "prix_total": data["totalAmount"]
         }
+        if not updated_reservation["date_debut"] or not updated_reservation["date_fin"]:
+            return jsonify({"error": "Invalid start or end date"}), 400
+        if updated_reservation["date_fin"] < updated_reservation["date_debut"]:
+            return jsonify({"error": "End date is before start date"}), 400
+
+        def write():
+            return mongo.db.reservations.find_one_and_update(
+                {"_id": ObjectId(reservation_id)},
+                {"$set": updated_reservation},
+                projection={"_id": 1}
+            )
 
-        result = mongo.db.reservations.update_one(
-            {"_id": ObjectId(reservation_id)},
-            {"$set": updated_reservation}
-        )
+        if updated_reservation["statut"] in ACTIVE_STATUSES:
+            previous = book({"_id": ObjectId(reservation_id), **updated_reservation}, write)
+        else:
+            previous = write()
+            availability.release(reservation_id)
 
-        if result.matched_count == 0:
+        if previous is None:
             return jsonify({"error": "Reservation not found"}), 404
 
+        versions.bump(RESERVATIONS)
+
         return jsonify({"message": "Reservation updated successfully"}), 200
 
+    except BookingError as e:
+        return jsonify({"error": e.message}), e.status_code
     except Exception as e:
-        print("Error updating reservation:", str(e))
+        logger.exception("Error updating reservation")
         return jsonify({
             "error": "Failed to update reservation",
             "message": str(e)
@@ -479,6 +585,7 @@ def update_car(car_id):
 
     if result.matched_count == 0:
         return jsonify({"error": "Car not found"}), 404
+    versions.bump(VOITURES)
     return jsonify({"message": "Car updated successfully"}), 200
 
 ##------------------------------------------##
@@ -504,13 +611,19 @@ def delete_manager(id):
 @manager_bp.route("/manager/reservations/<reservation_id>", methods=["DELETE"])
 def delete_reservation(reservation_id):
     try:
-        result = mongo.db.reservations.delete_one({"_id": ObjectId(reservation_id)})
-        if result.deleted_count == 1:
+        deleted = mongo.db.reservations.find_one_and_delete(
+            {"_id": ObjectId(reservation_id)},
+            projection={"_id": 1}
+        )
+        if deleted:
+            availability.release(reservation_id)
+            counters.increment("total_reservations", -1)
+            versions.bump(RESERVATIONS)
             return jsonify({"message": "Reservation deleted successfully"}), 200
         else:
             return jsonify({"error": "Reservation not found"}), 404
     except Exception as e:
-        print("Error deleting reservation:", str(e))
+        logger.exception("Error deleting reservation")
         return jsonify({
             "error": "Failed to delete reservation",
             "message": str(e)
@@ -524,7 +637,13 @@ def delete_client(client_id):
         result = mongo.db.clients.delete_one({"_id": ObjectId(client_id)})
         if result.deleted_count == 1:
             # Delete all reservations related to this client
-            mongo.db.reservations.delete_many({"client_id": ObjectId(client_id)})
+            related = list(mongo.db.reservations.find({"client_id": ObjectId(client_id)}, {"_id": 1}))
+            deleted = mongo.db.reservations.delete_many({"client_id": ObjectId(client_id)})
+            availability.release(*[reservation["_id"] for reservation in related])
+
+            counters.increment("total_clients", -1)
+            counters.increment("total_reservations", -deleted.deleted_count)
+            versions.bump(CLIENTS, RESERVATIONS)
             return jsonify({"message": "Client and related reservations deleted"}), 200
         else:
             return jsonify({"error": "Client not found"}), 404
@@ -539,7 +658,12 @@ def delete_car(car_id):
 
     if result.deleted_count == 1:
         # Delete all reservations related to this car
-        mongo.db.reservations.delete_many({"voiture_id": ObjectId(car_id)})
+        deleted = mongo.db.reservations.delete_many({"voiture_id": ObjectId(car_id)})
+        availability.release_car(car_id)
+
+        counters.increment("total_cars", -1)
+        counters.increment("total_reservations", -deleted.deleted_count)
+        versions.bump(VOITURES, RESERVATIONS)
         return jsonify({"message": "Car and related reservations deleted"}), 200
     else:
         return jsonify({"error": "Car not found"}), 404
@@ -567,6 +691,7 @@ def update_client(client_id):
             "CIN": data["CIN"],
             "permis_conduire": data["permis_conduire"],
             "numero_permis": data["numero_permis"],
+            **name_keys(data["nom"], data["prenom"]),
         }
 
         result = mongo.db.clients.update_one(
@@ -576,11 +701,12 @@ def update_client(client_id):
 
         if result.matched_count == 0:
             return jsonify({"error": "Client not found"}), 404
+        versions.bump(CLIENTS)
 
         return jsonify({"message": "Client updated successfully"}), 200
 
-    except Exception as e:
-        print("Error updating client:", str(e))
+    except Exception:
+        logger.exception("Error updating client")
         return jsonify({"error": "Failed to update client"}), 500
     
 ##--------------------------------------------##
@@ -597,22 +723,46 @@ def patch_reservation(reservation_id):
 
     if "status" in data:
         update_fields["statut"] = data["status"]
+        # Jour des annulations dans daily_snapshots
+        update_fields["date_statut"] = today()
 
     if "paymentStatus" in data:
         update_fields["paiement.statut"] = data["paymentStatus"]
+        if data["paymentStatus"] == PAID:
+            update_fields["paiement.date_paiement"] = today()
 
     if not update_fields:
         return jsonify({"error": "No valid fields to update"}), 400
 
-    # Directly access the collection via mongo
-    result = mongo.db.reservations.update_one(
-        {"_id": ObjectId(reservation_id)},
-        {"$set": update_fields}
-    )
+    def write():
+        return mongo.db.reservations.find_one_and_update(
+            {"_id": ObjectId(reservation_id)},
+            {"$set": update_fields},
+            projection={"_id": 1}
+        )
 
-    if result.matched_count == 0:
+    if update_fields.get("statut") in ACTIVE_STATUSES:
+        # Reactiver une reservation peut la faire chevaucher une autre
+        current = mongo.db.reservations.find_one(
+            {"_id": ObjectId(reservation_id)},
+            {"voiture_id": 1, "date_debut": 1, "date_fin": 1}
+        )
+        if current is None:
+            return jsonify({"error": "Reservation not found"}), 404
+        try:
+            reservation = book(current, write)
+        except BookingError as e:
+            return jsonify({"error": e.message}), e.status_code
+    else:
+        reservation = write()
+        if reservation is not None and "statut" in update_fields:
+            availability.release(reservation_id)
+
+    if reservation is None:
         return jsonify({"error": "Reservation not found"}), 404
 
+    versions.bump(RESERVATIONS)
+
     return jsonify({"message": "Reservation updated successfully"}), 200
 
 ##--------------------------------------------##
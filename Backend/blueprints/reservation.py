@@ -1,18 +1,17 @@
 from flask import Blueprint, jsonify
 from db import mongo
+from utils.dates import iso_date
+from utils.response_cache import RESERVATIONS
+from utils.versions import conditional
 
 reservation_bp = Blueprint('reservation', __name__)
 
 @reservation_bp.route('/manager/reservations', methods=['GET'])
+@conditional(RESERVATIONS)
 def get_reservations():
     reservations = list(mongo.db.reservations.find())
     for res in reservations:
-        res['_id'] = str(res['_id'])
-        res['client_id'] = str(res['client_id'])
-        res['voiture_id'] = str(res['voiture_id'])
-        res['manager_createur_id'] = str(res['manager_createur_id'])
-        res['manager_traiteur_id'] = str(res['manager_traiteur_id'])
-        res['date_debut'] = res['date_debut'].isoformat() 
-        res['date_fin'] = res['date_fin'].isoformat() 
-        res['date_reservation'] = res['date_reservation'].isoformat() 
+        res['date_debut'] = iso_date(res.get('date_debut'))
+        res['date_fin'] = iso_date(res.get('date_fin'))
+        res['date_reservation'] = iso_date(res.get('date_reservation'))
     return jsonify(reservations)
@@ -7,10 +7,68 @@ load_dotenv()
 class Config:
     SECRET_KEY = os.getenv("SECRET_KEY", "f11d93faae63d3322d96a3e5d83f9fe63db74d04728caa908e63e59dc12e1d26")
     MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/CarRental")
+    # Pool de connexions par processus (defauts pymongo: 100, 0, attente illimitee)
+    MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", 100))
+    MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", 0))
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", 0)) or None
+
+    # Cache disque des images GridFS (sous UPLOAD_FOLDER)
+    IMAGE_CACHE_ENABLED = os.getenv("IMAGE_CACHE_ENABLED", "false").lower() == "true"
+    IMAGE_CACHE_DIR = os.getenv("IMAGE_CACHE_DIR", "image_cache")
+    IMAGE_CACHE_MAX_BYTES = int(os.getenv("IMAGE_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+    # Intervalle de reconciliation des totaux du tableau de bord (flask run-jobs; 0 = jamais)
+    STATS_RECONCILE_SECONDS = int(os.getenv("STATS_RECONCILE_SECONDS", 300))
+
+    # Cache des reponses GET publiques: "memory" (par worker) ou "mongo" (partage)
+    RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory")
+    RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", 60))
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 1024))
+
+    # /admin/analytics/* lit le rollup quotidien (flask rollup-analytics) plutot que les reservations
+    ANALYTICS_USE_ROLLUP = os.getenv("ANALYTICS_USE_ROLLUP", "false").lower() == "true"
+
+    # Snapshots quotidiens (daily_snapshots) calcules chaque nuit a SNAPSHOT_HOUR par `flask run-jobs`
+    SNAPSHOT_JOB_ENABLED = os.getenv("SNAPSHOT_JOB_ENABLED", "false").lower() == "true"
+    SNAPSHOT_HOUR = int(os.getenv("SNAPSHOT_HOUR", 2))
+
+    # Server-Timing et /admin/metrics: commandes Mongo et latences par route
+    INSTRUMENTATION_ENABLED = os.getenv("INSTRUMENTATION_ENABLED", "true").lower() == "true"
+
+    # Logs JSON sur stdout, ecrits par un thread dedie
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+    LOG_LEVELS = os.getenv("LOG_LEVELS", "")  # par logger: "pymongo=WARNING,blueprints.manager=DEBUG"
+    LOG_ACCESS = os.getenv("LOG_ACCESS", "true").lower() == "true"
+    LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+
+    # Profilage echantillonne: part des requetes profilees (en plus de l'en-tete X-Profile, admin)
+    PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0.0))
+    PROFILE_INTERVAL_MS = int(os.getenv("PROFILE_INTERVAL_MS", 5))
+    # Profils gardes (collection capped partagee par les workers)
+    PROFILE_BUFFER_SIZE = int(os.getenv("PROFILE_BUFFER_SIZE", 100))
 
 class DevConfig(Config):
     DEBUG = True
 
 class ProdConfig(Config):
     DEBUG = False
+    # Obligatoire en production: create_app refuse de demarrer sans
+    SECRET_KEY = os.getenv("SECRET_KEY")
     MONGO_URI = os.getenv("MONGO_URI", "mongodb://prod_db:27017/CarRental")
+
+    # gunicorn (gunicorn.conf.py): processus x threads
+    WEB_BIND = os.getenv("WEB_BIND", "0.0.0.0:8000")
+    WEB_WORKERS = int(os.getenv("WEB_WORKERS", os.cpu_count() or 1))
+    WEB_THREADS = int(os.getenv("WEB_THREADS", 8))
+    WEB_TIMEOUT = int(os.getenv("WEB_TIMEOUT", 30))
+    # Le maitre gunicorn lance aussi un unique processus `flask run-jobs`
+    WEB_RUN_JOBS = os.getenv("WEB_RUN_JOBS", "false").lower() == "true"
+
+    # Une connexion par thread de requete, plus une marge (profiler, moniteurs
+    # pymongo); au-dela, echec rapide plutot qu'une file d'attente illimitee
+    MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", WEB_THREADS + 4))
+    MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", WEB_THREADS))
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", 2000)) or None
+
+    # Cache de reponses partage: chaque worker profite des calculs des autres
+    RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "mongo")
@@ -0,0 +1,86 @@
+# gunicorn -c gunicorn.conf.py wsgi:app (depuis Backend/)
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from config import ProdConfig
+
+if not ProdConfig.SECRET_KEY:
+    sys.exit("SECRET_KEY manquant: a definir dans l'environnement")
+
+bind = ProdConfig.WEB_BIND
+workers = ProdConfig.WEB_WORKERS
+worker_class = "gthread"
+threads = ProdConfig.WEB_THREADS
+timeout = ProdConfig.WEB_TIMEOUT
+graceful_timeout = ProdConfig.WEB_TIMEOUT
+keepalive = 5
+
+# L'application (et donc le MongoClient et ses connexions) est creee dans
+# chaque worker apres le fork: pymongo n'est pas fork-safe
+preload_app = False
+
+# Les lignes d'acces sont deja ecrites en JSON par utils/log.py
+accesslog = None
+errorlog = "-"
+
+
+# Taches periodiques (compteurs, snapshots): un seul processus pour tout le
+# serveur, lance par le maitre, jamais par les workers. Le maitre le recolte
+# comme ses workers: "Worker (pid:...) was sent SIGTERM" ou "exited with
+# code" peut le concerner. Un thread du maitre le relance s'il s'arrete.
+JOBS_CHECK_SECONDS = 5
+JOBS_RESTART_MAX_DELAY = 300
+# Un processus qui a tenu plus longtemps remet l'attente de relance au minimum
+JOBS_STABLE_SECONDS = 60
+
+
+def start_jobs(server):
+    server.jobs_process = subprocess.Popen(
+        [sys.executable, "-m", "flask", "--app", "wsgi", "run-jobs"],
+        cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    server.jobs_started = time.monotonic()
+    server.log.info("run-jobs lance (pid %s)", server.jobs_process.pid)
+
+
+def stopping(server):
+    # stop() vide LISTENERS des le debut de l'arret, on_exit ne vient qu'apres les workers
+    return server.jobs_stopping.is_set() or not server.LISTENERS
+
+
+def watch_jobs(server):
+    delay = JOBS_CHECK_SECONDS
+    while not server.jobs_stopping.wait(JOBS_CHECK_SECONDS):
+        # poll() voit aussi un processus deja recolte par le maitre (code de sortie perdu)
+        if server.jobs_process.poll() is None:
+            if time.monotonic() - server.jobs_started > JOBS_STABLE_SECONDS:
+                delay = JOBS_CHECK_SECONDS
+            continue
+        if stopping(server):
+            return
+        server.log.error("run-jobs (pid %s) arrete, relance dans %ss", server.jobs_process.pid, delay)
+        if server.jobs_stopping.wait(delay) or stopping(server):
+            return
+        start_jobs(server)
+        # Arrets en boucle: attente doublee a chaque relance
+        delay = min(delay * 2, JOBS_RESTART_MAX_DELAY)
+
+
+def when_ready(server):
+    if ProdConfig.WEB_RUN_JOBS:
+        start_jobs(server)
+        server.jobs_stopping = threading.Event()
+        threading.Thread(target=watch_jobs, args=(server,), name="run-jobs-watch", daemon=True).start()
+
+
+def on_exit(server):
+    process = getattr(server, "jobs_process", None)
+    if process is None:
+        return
+    server.jobs_stopping.set()
+    if process.poll() is None:
+        process.terminate()
+        process.wait(timeout=30)
@@ -7,17 +7,55 @@ from config import Config
 import os 
 
 from db import mongo
-from blueprints import admin, client, manager, reservation, cars, index
+from utils.availability import availability, rebuild_occupancy_command
+from utils.booking import bench_booking_command
+from utils.migrations import migrate_client_names_command, migrate_dates_command
+from utils.indexes import check_indexes_command, init_indexes
+from utils.json_provider import MongoJSONProvider
+from utils.log import logs
+from utils.instrumentation import metrics
+from utils.profiler import profiler
+from utils.image_cache import image_cache
+from utils.stats import counters, reconcile_counters_command
+from utils.response_cache import response_cache
+from utils.versions import versions
+from utils.analytics import rollup_analytics_command
+from utils.snapshots import snapshot_days_command
+from utils.jobs import run_jobs_command
+from blueprints import admin, analytics, client, manager, reservation, cars, index
 
-def create_app():
+def mongo_pool_options(app):
+    """Taille du pool de connexions du MongoClient, depuis la config."""
+    options = {
+        "maxPoolSize": app.config.get("MONGO_MAX_POOL_SIZE"),
+        "minPoolSize": app.config.get("MONGO_MIN_POOL_SIZE"),
+        "waitQueueTimeoutMS": app.config.get("MONGO_WAIT_QUEUE_TIMEOUT_MS"),
+    }
+    return {name: value for name, value in options.items() if value is not None}
+
+def create_app(config_class=Config):
     app = Flask(__name__)
-    app.config.from_object(Config)
+    app.config.from_object(config_class)
+    if not app.config.get("SECRET_KEY"):
+        raise RuntimeError("SECRET_KEY manquant: a definir dans l'environnement")
+    logs.init_app(app)
 
     CORS(app)
-    mongo.init_app(app)
+    # connect=False (flask_pymongo): les connexions s'ouvrent dans le worker, apres le fork
+    mongo.init_app(app, **mongo_pool_options(app), **metrics.client_options(app))
+    # Apres mongo.init_app, qui installe son propre provider (BSONProvider, JSON etendu)
+    app.json = MongoJSONProvider(app)
+    metrics.init_app(app)
+    profiler.init_app(app)
+    init_indexes(app)
+    availability.init_app(app)
+    counters.init_app(app)
+    response_cache.init_app(app)
+    versions.init_app(app)
 
     UPLOAD_FOLDER = os.path.join(os.getcwd(), 'uploads')
     app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+    image_cache.init_app(app)
 
     # Route pour servir les images uploadées
     @app.route('/uploads/<filename>')
@@ -32,6 +70,17 @@ def create_app():
     app.register_blueprint(client.client_bp)  
     app.register_blueprint(manager.manager_bp)
     app.register_blueprint(reservation.reservation_bp) 
+    app.register_blueprint(analytics.analytics_bp)
+
+    app.cli.add_command(migrate_dates_command)
+    app.cli.add_command(migrate_client_names_command)
+    app.cli.add_command(check_indexes_command)
+    app.cli.add_command(bench_booking_command)
+    app.cli.add_command(rebuild_occupancy_command)
+    app.cli.add_command(rollup_analytics_command)
+    app.cli.add_command(snapshot_days_command)
+    app.cli.add_command(run_jobs_command)
+    app.cli.add_command(reconcile_counters_command)
     
     return app
 
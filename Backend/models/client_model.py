@@ -1,6 +1,7 @@
 from datetime import datetime
 from bson import ObjectId
 from db import mongo
+from utils.names import name_keys
 
 class Client:
     def __init__(
@@ -46,5 +47,6 @@ class Client:
             "date_expiration": self.date_expiration,
             "CIN": self.CIN,
             "photo": self.photo,
-            "date_ajout": self.date_ajout
+            "date_ajout": self.date_ajout,
+            **name_keys(self.nom, self.prenom)
         }
\ No newline at end of file
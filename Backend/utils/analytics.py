@@ -0,0 +1,233 @@
+from datetime import timedelta
+
+import click
+from db import mongo
+from utils.dates import to_datetime, today
+from utils.enrichment import fetch_by_ids
+
+# Reservations comptees dans le chiffre d'affaires
+REVENUE_STATUSES = ["acceptée"]
+REVENUE_GROUPS = ("month", "car", "fuel")
+
+DAY_MS = 24 * 60 * 60 * 1000
+# prix_total est parfois stocke en string ("3244")
+AMOUNT = {"$convert": {"input": "$prix_total", "to": "double", "onError": 0, "onNull": 0}}
+# Duree en jours, debut et fin inclus
+RENTAL_DAYS = {"$add": [{"$divide": [{"$subtract": ["$date_fin", "$date_debut"]}, DAY_MS]}, 1]}
+
+
+def _period(field, start=None, end=None):
+    bounds = {}
+    if start is not None:
+        bounds["$gte"] = start
+    if end is not None:
+        bounds["$lte"] = end
+    return {field: bounds} if bounds else {}
+
+
+def default_period(days=30):
+    """Les `days` derniers jours, aujourd'hui inclus."""
+    end = today()
+    return end - timedelta(days=days - 1), end
+
+
+def _revenue_match(start=None, end=None):
+    # Le chiffre d'affaires est rattache au jour de debut de location
+    return {"statut": {"$in": REVENUE_STATUSES}, **_period("date_debut", start, end)}
+
+
+def revenue(group, start=None, end=None, use_rollup=False):
+    """Chiffre d'affaires par mois ("YYYY-MM"), voiture ou carburant.
+
+    Retourne [{"key", "revenue", "reservations"}], trie par cle. Avec
+    use_rollup, lit analytics_daily au lieu des reservations.
+    """
+    if use_rollup:
+        collection = mongo.db.analytics_daily
+        pipeline = [{"$match": _period("day", start, end)}]
+        day, amount, count = "$day", "$revenue", "$reservations"
+    else:
+        collection = mongo.db.reservations
+        pipeline = [{"$match": _revenue_match(start, end)}]
+        day, amount, count = "$date_debut", AMOUNT, 1
+
+    if group == "month":
+        key = {"$dateToString": {"format": "%Y-%m", "date": day}}
+    elif group == "car":
+        key = "$voiture_id"
+    else:
+        key = "$type_carburant"
+        if not use_rollup:
+            pipeline += [
+                {"$lookup": {"from": "voitures", "localField": "voiture_id", "foreignField": "_id", "as": "voiture"}},
+                {"$addFields": {"type_carburant": {"$arrayElemAt": ["$voiture.type_carburant", 0]}}},
+            ]
+
+    pipeline += [
+        {"$group": {"_id": key, "revenue": {"$sum": amount}, "reservations": {"$sum": count}}},
+        {"$sort": {"_id": 1}},
+    ]
+    return [
+        {"key": row["_id"], "revenue": row["revenue"], "reservations": row["reservations"]}
+        for row in collection.aggregate(pipeline)
+    ]
+
+
+def rental_length(start=None, end=None, use_rollup=False):
+    """Duree de location en jours: moyenne, minimum et maximum."""
+    if use_rollup:
+        rows = list(mongo.db.analytics_daily.aggregate([
+            {"$match": _period("day", start, end)},
+            {"$group": {
+                "_id": None,
+                "days": {"$sum": "$rental_days"},
+                "min_days": {"$min": "$min_days"},
+                "max_days": {"$max": "$max_days"},
+                "reservations": {"$sum": "$reservations"},
+            }},
+        ]))
+        if rows and rows[0]["reservations"]:
+            rows[0]["average_days"] = rows[0].pop("days") / rows[0]["reservations"]
+    else:
+        rows = list(mongo.db.reservations.aggregate([
+            {"$match": _revenue_match(start, end)},
+            {"$group": {
+                "_id": None,
+                "average_days": {"$avg": RENTAL_DAYS},
+                "min_days": {"$min": RENTAL_DAYS},
+                "max_days": {"$max": RENTAL_DAYS},
+                "reservations": {"$sum": 1},
+            }},
+        ]))
+    if not rows or not rows[0]["reservations"]:
+        return {"average_days": None, "min_days": None, "max_days": None, "reservations": 0}
+    return {field: rows[0][field] for field in ("average_days", "min_days", "max_days", "reservations")}
+
+
+def top_clients(start=None, end=None, limit=10):
+    """Clients tries par chiffre d'affaires (toujours depuis les reservations)."""
+    rows = list(mongo.db.reservations.aggregate([
+        {"$match": _revenue_match(start, end)},
+        {"$group": {"_id": "$client_id", "revenue": {"$sum": AMOUNT}, "reservations": {"$sum": 1}}},
+        {"$sort": {"revenue": -1}},
+        {"$limit": limit},
+    ]))
+    clients = fetch_by_ids(mongo.db.clients, [row["_id"] for row in rows], {"nom": 1, "prenom": 1, "email": 1})
+    result = []
+    for row in rows:
+        client = clients.get(row["_id"]) or {}
+        result.append({
+            "client_id": row["_id"],
+            "name": f"{client.get('prenom', '')} {client.get('nom', '')}".strip() or "Unknown",
+            "email": client.get("email"),
+            "revenue": row["revenue"],
+            "reservations": row["reservations"],
+        })
+    return result
+
+
+def utilization(start, end):
+    """Taux d'occupation de la flotte: jours reserves / (voitures x jours).
+
+    Lu dans occupancy (reservations actives, un document par voiture et par jour).
+    """
+    days = (end - start).days + 1
+    fleet = mongo.db.voitures.count_documents({})
+    per_car = list(mongo.db.occupancy.aggregate([
+        {"$match": _period("day", start, end)},
+        {"$group": {"_id": "$voiture_id", "booked_days": {"$sum": 1}}},
+        {"$sort": {"booked_days": -1}},
+    ]))
+    booked = sum(row["booked_days"] for row in per_car)
+    return {
+        "fleet": fleet,
+        "days": days,
+        "booked_days": booked,
+        "utilization": booked / (fleet * days) if fleet else 0,
+        "per_car": [
+            {"voiture_id": row["_id"], "booked_days": row["booked_days"], "utilization": row["booked_days"] / days}
+            for row in per_car
+        ],
+    }
+
+
+# --- Rollup quotidien ---
+
+def rebuild_rollup(start=None, end=None):
+    """Recalcule analytics_daily pour les jours de debut dans [start, end] (tout si omis).
+
+    Un document par (jour, voiture): revenue, reservations, rental_days
+    (somme, min et max), le type_carburant de la voiture et les ids des
+    reservations comptees.
+    Idempotent; retourne le nombre de documents.
+    """
+    return _rebuild_rollup(_period("date_debut", start, end), _period("day", start, end))
+
+
+def rebuild_rollup_days(days):
+    """Recalcule analytics_daily pour une liste de jours de debut."""
+    days = sorted(set(days))
+    if not days:
+        return 0
+    return _rebuild_rollup({"date_debut": {"$in": days}}, {"day": {"$in": days}})
+
+
+def changed_days(since):
+    """Jours du rollup touches par les reservations modifiees depuis since.
+
+    Les handlers datent les changements de statut et de prix (date_statut)
+    et les paiements (paiement.date_paiement). Le jour de debut actuel de
+    ces reservations est recalcule, ainsi que les jours ou le rollup les
+    comptait encore (date de debut modifiee).
+    """
+    changed = mongo.db.reservations.distinct("_id", {"$or": [
+        {"date_statut": {"$gte": since}},
+        {"paiement.date_paiement": {"$gte": since}},
+    ]})
+    if not changed:
+        return set()
+    days = set(mongo.db.reservations.distinct("date_debut", {"_id": {"$in": changed}}))
+    days.update(mongo.db.analytics_daily.distinct("day", {"reservation_ids": {"$in": changed}}))
+    return {day for day in days if day is not None}
+
+
+def _rebuild_rollup(reservations_match, rollup_match):
+    rows = list(mongo.db.reservations.aggregate([
+        {"$match": {"statut": {"$in": REVENUE_STATUSES}, **reservations_match}},
+        {"$group": {
+            "_id": {"day": "$date_debut", "voiture_id": "$voiture_id"},
+            "revenue": {"$sum": AMOUNT},
+            "reservations": {"$sum": 1},
+            "rental_days": {"$sum": RENTAL_DAYS},
+            "min_days": {"$min": RENTAL_DAYS},
+            "max_days": {"$max": RENTAL_DAYS},
+            "reservation_ids": {"$push": "$_id"},
+        }},
+    ]))
+    cars = fetch_by_ids(mongo.db.voitures, [row["_id"]["voiture_id"] for row in rows], {"type_carburant": 1})
+
+    docs = [{
+        "day": row["_id"]["day"],
+        "voiture_id": row["_id"]["voiture_id"],
+        "type_carburant": (cars.get(row["_id"]["voiture_id"]) or {}).get("type_carburant"),
+        "revenue": row["revenue"],
+        "reservations": row["reservations"],
+        "rental_days": row["rental_days"],
+        "min_days": row["min_days"],
+        "max_days": row["max_days"],
+        "reservation_ids": row["reservation_ids"],
+    } for row in rows]
+
+    mongo.db.analytics_daily.delete_many(rollup_match)
+    if docs:
+        mongo.db.analytics_daily.insert_many(docs)
+    return len(docs)
+
+
+@click.command("rollup-analytics")
+@click.option("--from", "start", help="Premier jour (YYYY-MM-DD); tout l'historique si omis.")
+@click.option("--to", "end", help="Dernier jour (YYYY-MM-DD).")
+def rollup_analytics_command(start, end):
+    """Recalcule le rollup quotidien utilise par /admin/analytics/*?source=rollup."""
+    count = rebuild_rollup(to_datetime(start) if start else None, to_datetime(end) if end else None)
+    click.echo(f"analytics_daily: {count} document(s)")
@@ -0,0 +1,189 @@
+import logging
+from datetime import datetime, time, timedelta
+
+import click
+from bson import ObjectId
+from pymongo import InsertOne
+from pymongo.errors import BulkWriteError
+from db import mongo
+from utils.dates import to_date
+
+logger = logging.getLogger(__name__)
+
+# Statuts qui bloquent une voiture
+ACTIVE_STATUSES = ("acceptée", "en attente")
+
+BATCH_SIZE = 500
+
+
+def day_bounds(start, end):
+    """(premier, dernier) jour en datetime a minuit, ou None si la periode est invalide."""
+    start, end = to_date(start), to_date(end)
+    if start is None or end is None or end < start:
+        return None
+    return datetime.combine(start, time.min), datetime.combine(end, time.min)
+
+
+def booked_days(start, end):
+    """Jours (datetime a minuit) de start a end inclus."""
+    bounds = day_bounds(start, end)
+    if bounds is None:
+        return []
+    first, last = bounds
+    return [first + timedelta(days=i) for i in range((last - first).days + 1)]
+
+
+class Availability:
+    """Occupation des voitures: un document par voiture et par jour reserve.
+
+    La collection occupancy est derivee des reservations actives et tenue a
+    jour par les handlers d'ecriture. L'index unique (voiture_id, day)
+    garantit qu'un jour ne peut etre pris que par une seule reservation;
+    les tests de disponibilite sont des lookups indexes.
+    """
+
+    @property
+    def collection(self):
+        return mongo.db.occupancy
+
+    def init_app(self, app):
+        with app.app_context():
+            try:
+                # Jamais de reconstruction ici: plusieurs workers s'effaceraient leurs jours.
+                # Premier deploiement: lancer flask rebuild-occupancy une fois
+                if (self.collection.find_one({}, {"_id": 1}) is None
+                        and mongo.db.reservations.find_one({"statut": {"$in": list(ACTIVE_STATUSES)}}, {"_id": 1})):
+                    logger.warning("Occupancy is empty but active reservations exist: run flask rebuild-occupancy")
+            except Exception:
+                logger.exception("Error checking occupancy")
+
+    def rebuild(self):
+        """Reconstruit toute la collection; retourne les jours en conflit ignores.
+
+        A lancer hors trafic (flask rebuild-occupancy): les jours pris pendant
+        la reconstruction par des requetes en cours seraient effaces.
+        """
+        # Import local: utils.indexes importe ce module
+        from utils.indexes import ensure_indexes
+
+        self.collection.delete_many({})
+        # Collection vide: l'index unique se cree forcement et ecarte ensuite les doublons
+        if ensure_indexes(["occupancy"]):
+            raise RuntimeError("Index occupancy non cree")
+        cursor = mongo.db.reservations.find(
+            {"statut": {"$in": list(ACTIVE_STATUSES)}},
+            {"voiture_id": 1, "date_debut": 1, "date_fin": 1}
+        ).sort("_id", 1).batch_size(BATCH_SIZE)
+
+        conflicts = 0
+        operations = []
+        for reservation in cursor:
+            operations.extend(InsertOne(doc) for doc in self._slots(reservation))
+            if len(operations) >= BATCH_SIZE:
+                conflicts += self._insert_unordered(operations)
+                operations = []
+        if operations:
+            conflicts += self._insert_unordered(operations)
+        return conflicts
+
+    def _insert_unordered(self, operations):
+        # Donnees anterieures au verrouillage: le premier arrive garde le jour
+        try:
+            self.collection.bulk_write(operations, ordered=False)
+            return 0
+        except BulkWriteError as e:
+            return len(e.details.get("writeErrors", []))
+
+    def _slots(self, reservation, days=None):
+        if days is None:
+            days = booked_days(reservation.get("date_debut"), reservation.get("date_fin"))
+        return [
+            {"voiture_id": reservation["voiture_id"], "day": day, "reservation_id": reservation["_id"]}
+            for day in days
+        ]
+
+    # --- Mises a jour depuis les handlers d'ecriture ---
+
+    def claim(self, reservation):
+        """Prend les jours de la reservation qu'elle n'occupe pas deja.
+
+        Retourne la liste des jours ajoutes, ou None (sans rien garder) si un
+        jour appartient deja a une autre reservation de la meme voiture.
+        """
+        owned = {
+            slot["day"] for slot in self.collection.find(
+                {"reservation_id": reservation["_id"], "voiture_id": reservation["voiture_id"]},
+                {"day": 1}
+            )
+        }
+        wanted = booked_days(reservation["date_debut"], reservation["date_fin"])
+        new_days = [day for day in wanted if day not in owned]
+        if not new_days:
+            return new_days
+
+        try:
+            self.collection.insert_many(self._slots(reservation, new_days), ordered=True)
+            return new_days
+        except BulkWriteError as e:
+            self.unclaim(reservation, new_days[:e.details.get("nInserted", 0)])
+            return None
+
+    def unclaim(self, reservation, days):
+        """Annule un claim(): rend les jours qu'il avait ajoutes."""
+        if days:
+            self.collection.delete_many({
+                "reservation_id": reservation["_id"],
+                "voiture_id": reservation["voiture_id"],
+                "day": {"$in": days}
+            })
+
+    def trim(self, reservation):
+        """Libere les jours que la reservation n'occupe plus (periode ou voiture changee)."""
+        wanted = booked_days(reservation["date_debut"], reservation["date_fin"])
+        self.collection.delete_many({
+            "reservation_id": reservation["_id"],
+            "$or": [
+                {"voiture_id": {"$ne": reservation["voiture_id"]}},
+                {"day": {"$nin": wanted}},
+            ]
+        })
+
+    def release(self, *reservation_ids):
+        self.collection.delete_many({"reservation_id": {"$in": [ObjectId(r) for r in reservation_ids]}})
+
+    def release_car(self, car_id):
+        self.collection.delete_many({"voiture_id": ObjectId(car_id)})
+
+    # --- Requetes ---
+
+    def is_free(self, car_id, start, end=None):
+        bounds = day_bounds(start, end if end is not None else start)
+        if bounds is None:
+            return True
+        return self.collection.find_one(
+            {"voiture_id": ObjectId(car_id), "day": {"$gte": bounds[0], "$lte": bounds[1]}},
+            {"_id": 1}
+        ) is None
+
+    def busy_cars(self, start, end=None):
+        """Ids (str) des voitures occupees au moins un jour de la periode."""
+        bounds = day_bounds(start, end if end is not None else start)
+        if bounds is None:
+            return set()
+        return {
+            str(car_id) for car_id in self.collection.distinct(
+                "voiture_id", {"day": {"$gte": bounds[0], "$lte": bounds[1]}}
+            )
+        }
+
+
+availability = Availability()
+
+
+@click.command("rebuild-occupancy")
+def rebuild_occupancy_command():
+    """Reconstruit la collection occupancy depuis les reservations actives."""
+    conflicts = availability.rebuild()
+    click.echo(f"occupancy: {availability.collection.count_documents({})} jour(s) reserve(s)")
+    if conflicts:
+        click.echo(f"{conflicts} jour(s) deja pris par une autre reservation (ignores)")
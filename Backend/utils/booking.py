@@ -0,0 +1,207 @@
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import click
+from bson import ObjectId
+from flask import current_app
+from pymongo.errors import DuplicateKeyError
+from db import mongo
+from utils.availability import availability
+from utils.dates import today
+from utils.indexes import has_occupancy_unique_index
+
+# Duree du bail d'un verrou: un worker mort ne bloque pas la voiture plus longtemps
+LOCK_LEASE_SECONDS = 10
+# Attente maximale pour obtenir le verrou d'une voiture
+LOCK_WAIT_SECONDS = 5
+
+
+class BookingError(Exception):
+    status_code = 500
+    message = "Booking failed"
+
+
+class BookingConflict(BookingError):
+    """La voiture a deja une reservation active qui chevauche la periode."""
+
+    status_code = 409
+    message = "Car is already booked for these dates"
+
+    def __init__(self, reservation):
+        super().__init__(self.message)
+        self.reservation = reservation
+
+
+class BookingBusy(BookingError):
+    """Le verrou de la voiture n'a pas pu etre obtenu a temps."""
+
+    status_code = 503
+    message = "Car is being booked by someone else, please retry"
+
+
+class BookingUnavailable(BookingError):
+    """L'index unique d'occupancy manque: rien n'empecherait un chevauchement."""
+
+    status_code = 503
+    message = "Bookings are temporarily unavailable"
+
+
+_exclusive = False
+
+
+def require_exclusive_occupancy():
+    # Verifie une fois par processus; tant que l'index manque, chaque appel reverifie
+    global _exclusive
+    if not _exclusive:
+        if not has_occupancy_unique_index():
+            raise BookingUnavailable()
+        _exclusive = True
+
+
+@contextmanager
+def car_lock(car_id):
+    """Verrou exclusif par voiture: un document par voiture dans booking_locks.
+
+    L'acquisition est un upsert conditionnel: si un verrou non expire existe,
+    le filtre ne correspond pas et l'insertion echoue sur l'_id (DuplicateKeyError).
+    Deux voitures differentes n'ont jamais de verrou commun.
+    """
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + LOCK_WAIT_SECONDS
+    delay = 0.005
+    while True:
+        now = datetime.utcnow()
+        try:
+            mongo.db.booking_locks.find_one_and_update(
+                {"_id": car_id, "expires_at": {"$lt": now}},
+                {"$set": {"owner": token, "expires_at": now + timedelta(seconds=LOCK_LEASE_SECONDS)}},
+                upsert=True
+            )
+            break
+        except DuplicateKeyError:
+            if time.monotonic() > deadline:
+                raise BookingBusy()
+            time.sleep(delay * random.uniform(1, 2))
+            delay = min(delay * 2, 0.1)
+
+    try:
+        yield
+    finally:
+        mongo.db.booking_locks.delete_one({"_id": car_id, "owner": token})
+
+
+def book(reservation, write):
+    """Execute write() sous le verrou de la voiture, si la periode est libre.
+
+    `reservation` porte _id, voiture_id, date_debut et date_fin. Les jours
+    sont pris dans occupancy avant l'ecriture (l'index unique rejette tout
+    chevauchement) et rendus si l'ecriture echoue ou ne trouve rien.
+    Leve BookingConflict, BookingBusy ou BookingUnavailable; retourne le
+    resultat de write().
+    """
+    require_exclusive_occupancy()
+    with car_lock(reservation["voiture_id"]):
+        added = availability.claim(reservation)
+        if added is None:
+            raise BookingConflict(reservation)
+        try:
+            result = write()
+        except Exception:
+            availability.unclaim(reservation, added)
+            raise
+        if result is None:
+            availability.release(reservation["_id"])
+        else:
+            availability.trim(reservation)
+        return result
+
+
+@click.command("bench-booking")
+@click.option("--threads", default=8, show_default=True, help="Reservations en parallele.")
+@click.option("--bookings", default=400, show_default=True, help="Nombre total de tentatives.")
+@click.option("--cars", default=20, show_default=True, help="Voitures fictives (1 = contention maximale).")
+def bench_booking_command(threads, bookings, cars):
+    """Mesure le debit du chemin de reservation sous charge parallele.
+
+    Ecrit dans reservations et occupancy: refuse de tourner si le nom de la
+    base (MONGO_URI) ne contient pas "bench". Les reservations creees portent
+    bench=True et sont supprimees a la fin, meme apres une erreur ou Ctrl-C.
+    """
+    if "bench" not in mongo.db.name.lower():
+        raise click.ClickException(
+            f"La base '{mongo.db.name}' n'est pas une base de test: utilisez un MONGO_URI dont la base contient 'bench'"
+        )
+
+    app = current_app._get_current_object()
+    car_ids = [ObjectId() for _ in range(cars)]
+    start_day = today()
+    latencies, outcomes = [], {"created": 0, "conflict": 0, "busy": 0}
+    results_lock = threading.Lock()
+    remaining = iter(range(bookings))
+    stop = threading.Event()
+
+    def worker():
+        with app.app_context():
+            for _ in remaining:
+                if stop.is_set():
+                    return
+                car_id = random.choice(car_ids)
+                start = start_day + timedelta(days=random.randrange(60))
+                end = start + timedelta(days=random.randrange(1, 6))
+                reservation = {
+                    "_id": ObjectId(), "voiture_id": car_id, "date_debut": start, "date_fin": end,
+                    "statut": "en attente", "bench": True
+                }
+                began = time.perf_counter()
+                try:
+                    book(reservation, lambda: mongo.db.reservations.insert_one(reservation))
+                    outcome = "created"
+                except BookingConflict:
+                    outcome = "conflict"
+                except BookingBusy:
+                    outcome = "busy"
+                with results_lock:
+                    latencies.append(time.perf_counter() - began)
+                    outcomes[outcome] += 1
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    try:
+        began = time.perf_counter()
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+        elapsed = time.perf_counter() - began
+
+        # Aucune paire de reservations creees ne doit se chevaucher
+        overlaps = 0
+        for car_id in car_ids:
+            created = sorted(
+                (r["date_debut"], r["date_fin"])
+                for r in mongo.db.reservations.find({"bench": True, "voiture_id": car_id})
+            )
+            overlaps += sum(1 for a, b in zip(created, created[1:]) if b[0] <= a[1])
+    finally:
+        # Les threads doivent avoir fini d'ecrire avant le nettoyage
+        stop.set()
+        for thread in pool:
+            if thread.is_alive():
+                thread.join()
+        bench_ids = mongo.db.reservations.distinct("_id", {"bench": True})
+        availability.release(*bench_ids)
+        mongo.db.reservations.delete_many({"bench": True})
+
+    latencies.sort()
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+
+    click.echo(f"{bookings} tentatives, {threads} threads, {cars} voiture(s): {bookings / elapsed:.0f} req/s")
+    click.echo(f"p50 {percentile(0.5):.1f} ms  p95 {percentile(0.95):.1f} ms  p99 {percentile(0.99):.1f} ms")
+    click.echo(f"creees {outcomes['created']}  conflits {outcomes['conflict']}  verrou occupe {outcomes['busy']}")
+    if overlaps:
+        raise click.ClickException(f"{overlaps} chevauchement(s) detecte(s)")
@@ -0,0 +1,53 @@
+from datetime import date, datetime, time, timezone
+
+DATE_FORMAT = "%Y-%m-%d"
+
+
+def to_date(value):
+    """Convertit une date stockee (datetime, date ou "YYYY-MM-DD[T...]") en date."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str):
+        try:
+            return datetime.strptime(value.split("T")[0], DATE_FORMAT).date()
+        except ValueError:
+            return None
+    return None
+
+
+def to_datetime(value, keep_time=False):
+    """Meme conversion que to_date mais retourne un datetime a minuit (date BSON).
+
+    Avec keep_time, l'heure d'une chaine ISO ("YYYY-MM-DDTHH:MM:SS") est conservee.
+    """
+    if isinstance(value, datetime):
+        return value
+    if keep_time and isinstance(value, str):
+        try:
+            moment = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+        if moment.tzinfo is not None:
+            moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+        return moment
+    day = to_date(value)
+    return datetime.combine(day, time.min) if day else None
+
+
+def format_date(value):
+    """Format "YYYY-MM-DD" attendu par le frontend manager."""
+    day = to_date(value)
+    return day.strftime(DATE_FORMAT) if day else value
+
+
+def iso_date(value):
+    moment = to_datetime(value)
+    return moment.isoformat() if moment else None
+
+
+def today():
+    return datetime.combine(date.today(), time.min)
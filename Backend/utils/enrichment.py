@@ -0,0 +1,57 @@
+from bson import ObjectId
+from db import mongo
+
+
+def _as_object_id(value):
+    # Les references sont stockees tantot en ObjectId, tantot en string
+    if isinstance(value, ObjectId):
+        return value
+    if isinstance(value, str) and ObjectId.is_valid(value):
+        return ObjectId(value)
+    return None
+
+
+def fetch_by_ids(collection, ids, projection=None):
+    """Charge tous les documents references en une seule requete $in.
+
+    Retourne un dict {ObjectId: document}.
+    """
+    unique_ids = {oid for oid in (_as_object_id(i) for i in ids) if oid is not None}
+    if not unique_ids:
+        return {}
+
+    if projection is not None:
+        projection = dict(projection)
+        projection["_id"] = 1
+
+    cursor = collection.find({"_id": {"$in": list(unique_ids)}}, projection)
+    return {doc["_id"]: doc for doc in cursor}
+
+
+def load_related(reservations, client_fields=None, car_fields=None):
+    """Resout les clients et voitures d'une liste de reservations.
+
+    Deux requetes au total, quel que soit le nombre de reservations.
+    Retourne (clients_by_id, cars_by_id).
+    """
+    client_projection = {field: 1 for field in client_fields} if client_fields else None
+    car_projection = {field: 1 for field in car_fields} if car_fields else None
+
+    clients = fetch_by_ids(
+        mongo.db.clients,
+        (res.get("client_id") for res in reservations),
+        client_projection
+    )
+    cars = fetch_by_ids(
+        mongo.db.voitures,
+        (res.get("voiture_id") for res in reservations),
+        car_projection
+    )
+    return clients, cars
+
+
+def lookup(docs_by_id, ref):
+    oid = _as_object_id(ref)
+    if oid is None:
+        return None
+    return docs_by_id.get(oid)
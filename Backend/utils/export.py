@@ -0,0 +1,80 @@
+import csv
+import io
+from datetime import date, datetime
+
+from bson import ObjectId
+from utils.json_provider import dumps
+
+EXPORT_BATCH_SIZE = 500
+
+# Colonnes CSV par collection (les champs imbriques sont aplatis avec un ".")
+CSV_COLUMNS = {
+    "reservations": [
+        "_id", "client_id._id", "client_id.nom", "client_id.prenom",
+        "voiture_id._id", "voiture_id.marque", "voiture_id.modele",
+        "date_debut", "date_fin", "date_reservation", "statut", "prix_total",
+        "discount", "paiement.methode", "paiement.statut",
+    ],
+    "clients": [
+        "_id", "nom", "prenom", "email", "telephone", "CIN", "permis_conduire",
+        "numero_permis", "date_expiration", "date_ajout", "adresse.rue",
+        "adresse.immeuble", "adresse.appartement", "adresse.ville", "adresse.code_postal",
+    ],
+    "voitures": [
+        "_id", "marque", "modele", "annee", "immatriculation", "couleur", "kilometrage",
+        "prix_journalier", "status", "type_carburant", "nombre_places", "options", "date_ajout",
+    ],
+}
+
+
+def iter_batches(cursor, size=EXPORT_BATCH_SIZE):
+    batch = []
+    for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return "|".join(_cell(item) for item in value)
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _get_path(doc, path):
+    for key in path.split("."):
+        if not isinstance(doc, dict):
+            return None
+        doc = doc.get(key)
+    return doc
+
+
+def ndjson_lines(batches):
+    for batch in batches:
+        yield "".join(dumps(doc) + "\n" for doc in batch)
+
+
+def csv_lines(batches, columns):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(columns)
+    for batch in batches:
+        for doc in batch:
+            writer.writerow([_cell(_get_path(doc, column)) for column in columns])
+        # Un chunk par batch, le buffer est vide a chaque fois
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+
+    if buffer.tell():
+        yield buffer.getvalue()
@@ -0,0 +1,143 @@
+import glob
+import mimetypes
+import os
+import threading
+import uuid
+
+
+class ImageDiskCache:
+    """Cache LRU sur disque des images GridFS, borne en octets.
+
+    Les cles sont "<id>" pour un original et "<id>-<taille>-<format>" pour une
+    variante; le fichier porte l'extension de son content_type. Le repertoire
+    est le seul etat partage entre workers: l'ordre LRU est la date de
+    modification des fichiers (rafraichie a chaque hit) et la limite est
+    verifiee par un parcours du repertoire apres chaque ecriture.
+    """
+
+    def __init__(self):
+        self.directory = None
+        self.max_bytes = 0
+        self._lock = threading.Lock()
+        self._paths = {}  # cle -> chemin, memo local au worker
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def init_app(self, app):
+        if not app.config.get("IMAGE_CACHE_ENABLED"):
+            return
+        self.directory = os.path.join(app.config["UPLOAD_FOLDER"], app.config["IMAGE_CACHE_DIR"])
+        self.max_bytes = app.config["IMAGE_CACHE_MAX_BYTES"]
+        os.makedirs(self.directory, exist_ok=True)
+        self._evict()
+
+    @property
+    def enabled(self):
+        return self.directory is not None
+
+    def _files(self):
+        """[(mtime, chemin, taille)] des fichiers en cache, du moins recent au plus recent."""
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.name.startswith(".") or not entry.is_file():
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, entry.path, stat.st_size))
+        return sorted(files)
+
+    def _evict(self):
+        files = self._files()
+        total = sum(size for _, _, size in files)
+        for _, path, size in files:
+            if total <= self.max_bytes:
+                break
+            total -= size
+            try:
+                os.remove(path)
+                self.evictions += 1
+            except OSError:
+                pass
+
+    def _find(self, key):
+        path = self._paths.get(key)
+        if path and os.path.exists(path):
+            return path
+        # Ecrit par un autre worker
+        matches = glob.glob(os.path.join(glob.escape(self.directory), glob.escape(key) + ".*"))
+        return matches[0] if matches else None
+
+    def get(self, key):
+        """Chemin du fichier en cache, ou None."""
+        path = self._find(key)
+        with self._lock:
+            if path is None:
+                self._paths.pop(key, None)
+                self.misses += 1
+                return None
+            self._paths[key] = path
+            self.hits += 1
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return path
+
+    def put(self, key, grid_out):
+        """Copie un fichier GridFS dans le cache et retourne son chemin.
+
+        Retourne None si le fichier depasse a lui seul la taille du cache.
+        """
+        if grid_out.length > self.max_bytes:
+            return None
+
+        extension = mimetypes.guess_extension(grid_out.content_type or "") or ""
+        path = os.path.join(self.directory, key + extension)
+        temp_path = os.path.join(self.directory, f".{uuid.uuid4().hex}.tmp")
+
+        try:
+            with open(temp_path, "wb") as target:
+                for chunk in grid_out:
+                    target.write(chunk)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        with self._lock:
+            self._paths[key] = path
+            self._evict()
+        return path if os.path.exists(path) else None
+
+    def invalidate(self, image_id):
+        """Supprime du disque l'original et toutes ses variantes, quel que soit le worker."""
+        if not self.enabled:
+            return
+        image_id = str(image_id)
+        with self._lock:
+            for key in [k for k in self._paths if k == image_id or k.startswith(image_id + "-")]:
+                del self._paths[key]
+        for path in glob.glob(os.path.join(glob.escape(self.directory), glob.escape(image_id) + "*")):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self):
+        files = self._files() if self.enabled else []
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(files),
+                "bytes": sum(size for _, _, size in files),
+                "max_bytes": self.max_bytes,
+            }
+
+
+image_cache = ImageDiskCache()
@@ -0,0 +1,95 @@
+import io
+import logging
+
+from bson import ObjectId
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow absent: seules les images originales sont stockees
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# Tailles maximales (largeur, hauteur) des variantes generees a l'upload
+IMAGE_VARIANTS = {
+    "thumb": (160, 120),
+    "card": (480, 360),
+    "detail": (1280, 960),
+}
+VARIANT_FORMATS = {
+    "webp": ("WEBP", "image/webp"),
+    "jpeg": ("JPEG", "image/jpeg"),
+}
+VARIANT_QUALITY = 80
+
+
+def _render_variants(data):
+    """Retourne [(nom, format, content_type, bytes)] pour chaque variante."""
+    if Image is None:
+        return []
+    try:
+        source = Image.open(io.BytesIO(data))
+        source = ImageOps.exif_transpose(source)
+    except Exception:
+        # Image illisible par Pillow: l'original est stocke sans variantes
+        logger.warning("Error reading uploaded image", exc_info=True)
+        return []
+
+    rendered = []
+    for name, box in IMAGE_VARIANTS.items():
+        image = source.copy()
+        image.thumbnail(box, Image.LANCZOS)
+        for fmt, (pil_format, content_type) in VARIANT_FORMATS.items():
+            converted = image.convert("RGB") if pil_format == "JPEG" else image
+            buffer = io.BytesIO()
+            converted.save(buffer, pil_format, quality=VARIANT_QUALITY, optimize=True)
+            rendered.append((name, fmt, content_type, buffer.getvalue()))
+    return rendered
+
+
+def store_image(fs, file, filename):
+    """Stocke l'original et ses variantes dans GridFS; retourne l'id de l'original.
+
+    Chaque variante porte metadata.original_id, et l'original liste les ids
+    de ses variantes dans metadata.variants ({"card.webp": id, ...}).
+    """
+    data = file.read()
+    original_id = ObjectId()
+
+    variants = {}
+    for name, fmt, content_type, payload in _render_variants(data):
+        variants[f"{name}.{fmt}"] = fs.put(
+            payload,
+            filename=f"{name}-{filename}",
+            content_type=content_type,
+            metadata={"original_id": original_id, "variant": name, "format": fmt}
+        )
+
+    return fs.put(
+        data,
+        _id=original_id,
+        filename=filename,
+        content_type=file.content_type,
+        metadata={"variants": variants}
+    )
+
+
+def delete_image(fs, image_id):
+    """Supprime l'original et toutes ses variantes."""
+    image_id = ObjectId(image_id)
+    for variant in fs.find({"metadata.original_id": image_id}):
+        fs.delete(variant._id)
+    fs.delete(image_id)
+
+
+def preferred_format(accept_mimetypes):
+    # WebP seulement si le client l'annonce explicitement (pas via */*)
+    if any(mimetype == "image/webp" and quality > 0 for mimetype, quality in accept_mimetypes):
+        return "webp"
+    return "jpeg"
+
+
+def variant_id(original, size, fmt):
+    """Id GridFS de la variante demandee, ou None (image anterieure aux variantes)."""
+    variants = (original.metadata or {}).get("variants") or {}
+    return variants.get(f"{size}.{fmt}")
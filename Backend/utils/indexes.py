@@ -0,0 +1,214 @@
+import logging
+
+import click
+from bson import ObjectId
+from pymongo import ASCENDING, TEXT, IndexModel
+from db import mongo
+from utils.availability import ACTIVE_STATUSES
+from utils.dates import today
+
+logger = logging.getLogger(__name__)
+
+# Seul garde-fou contre la double reservation (voir utils/availability.py)
+OCCUPANCY_UNIQUE_INDEX = "voiture_jour"
+
+# Index declares par collection, appliques au demarrage (create_indexes est idempotent)
+INDEXES = {
+    "voitures": [
+        IndexModel([("immatriculation", ASCENDING)], name="immatriculation"),
+        # Recherche /cars/search
+        IndexModel([("type_carburant", ASCENDING), ("prix_journalier", ASCENDING)], name="carburant_prix"),
+        IndexModel([("prix_journalier", ASCENDING)], name="prix_journalier"),
+        IndexModel([("options", ASCENDING)], name="options"),
+    ],
+    "clients": [
+        IndexModel([("email", ASCENDING)], name="email"),
+        # Recherche /manager/clients/search: prefixes ancres sur les identifiants...
+        IndexModel([("CIN", ASCENDING)], name="CIN"),
+        IndexModel([("telephone", ASCENDING)], name="telephone"),
+        IndexModel([("numero_permis", ASCENDING)], name="numero_permis"),
+        # ...prefixes sur les noms normalises (voir utils/names.py)...
+        IndexModel([("nom_lc", ASCENDING)], name="nom_lc"),
+        IndexModel([("prenom_lc", ASCENDING)], name="prenom_lc"),
+        # ...et texte sur les noms (sans stemming ni mots vides: ce sont des noms propres)
+        IndexModel(
+            [("nom", TEXT), ("prenom", TEXT), ("email", TEXT)],
+            name="texte",
+            weights={"nom": 10, "prenom": 5, "email": 1},
+            default_language="none"
+        ),
+    ],
+    "reservations": [
+        IndexModel(
+            [("voiture_id", ASCENDING), ("date_debut", ASCENDING), ("date_fin", ASCENDING), ("statut", ASCENDING)],
+            name="voiture_periode_statut"
+        ),
+        IndexModel([("client_id", ASCENDING), ("date_fin", ASCENDING)], name="client_date_fin"),
+        IndexModel([("statut", ASCENDING), ("date_fin", ASCENDING)], name="statut_date_fin"),
+        IndexModel([("date_debut", ASCENDING)], name="date_debut"),
+        # Fenetres du calendrier: date_fin >= from borne le scan, date_debut <= to filtre dans l'index
+        IndexModel([("date_fin", ASCENDING), ("date_debut", ASCENDING)], name="date_fin_debut"),
+        # Snapshots quotidiens: reservations creees un jour donne
+        IndexModel([("date_reservation", ASCENDING)], name="date_reservation"),
+        # Rollup: reservations modifiees ou payees depuis le dernier passage
+        IndexModel([("date_statut", ASCENDING)], name="date_statut", sparse=True),
+        IndexModel([("paiement.date_paiement", ASCENDING)], name="date_paiement", sparse=True),
+    ],
+    "managers": [
+        IndexModel([("email", ASCENDING)], name="email"),
+    ],
+    "admins": [
+        IndexModel([("email", ASCENDING)], name="email"),
+    ],
+    "fs.files": [
+        # Meme index que celui cree par GridFS au premier put()
+        IndexModel([("filename", ASCENDING), ("uploadDate", ASCENDING)]),
+        IndexModel([("metadata.original_id", ASCENDING)], name="variante_original", sparse=True),
+    ],
+    "occupancy": [
+        # Un jour d'une voiture ne peut appartenir qu'a une reservation
+        IndexModel([("voiture_id", ASCENDING), ("day", ASCENDING)], name=OCCUPANCY_UNIQUE_INDEX, unique=True),
+        IndexModel([("day", ASCENDING), ("voiture_id", ASCENDING)], name="jour_voiture"),
+        IndexModel([("reservation_id", ASCENDING)], name="reservation"),
+    ],
+    "analytics_daily": [
+        IndexModel([("day", ASCENDING), ("voiture_id", ASCENDING)], name="jour_voiture", unique=True),
+        IndexModel([("reservation_ids", ASCENDING)], name="reservations"),
+    ],
+    "booking_locks": [
+        # Nettoie les verrous abandonnes; l'acquisition ignore deja les baux expires
+        IndexModel([("expires_at", ASCENDING)], name="expiration", expireAfterSeconds=0),
+    ],
+    "response_cache": [
+        IndexModel([("expires_at", ASCENDING)], name="expiration", expireAfterSeconds=0),
+        IndexModel([("tags", ASCENDING)], name="tags"),
+    ],
+}
+
+
+def ensure_indexes(collections=None):
+    """Cree les index collection par collection; retourne les collections en echec."""
+    failed = []
+    for name, indexes in INDEXES.items():
+        if collections is None or name in collections:
+            try:
+                mongo.db[name].create_indexes(indexes)
+            except Exception:
+                logger.exception("Error creating indexes", extra={"collection": name})
+                failed.append(name)
+    return failed
+
+
+def has_occupancy_unique_index():
+    index = mongo.db.occupancy.index_information().get(OCCUPANCY_UNIQUE_INDEX)
+    return bool(index and index.get("unique"))
+
+
+def init_indexes(app):
+    with app.app_context():
+        try:
+            ensure_indexes()
+            if not has_occupancy_unique_index():
+                # book() refuse alors toute reservation (voir utils/booking.py)
+                logger.error("Missing unique occupancy index, bookings disabled until flask rebuild-occupancy")
+        except Exception:
+            logger.exception("Error checking indexes")
+
+
+def hot_queries():
+    """Requetes frequentes des blueprints, sous forme de commandes explain."""
+    some_id = ObjectId()
+    now = today()
+    active = {"$in": list(ACTIVE_STATUSES)}
+    return [
+        ("admins.login", {"find": "admins", "filter": {"email": "admin@location.com"}}),
+        ("reservations.active_clients", {
+            "distinct": "reservations", "key": "client_id",
+            "query": {"date_fin": {"$gte": now}, "statut": active}
+        }),
+        ("reservations.upcoming", {
+            "find": "reservations", "filter": {"date_debut": {"$gte": now}}, "sort": {"date_debut": 1}
+        }),
+        ("reservations.availability_rebuild", {"find": "reservations", "filter": {"statut": active}}),
+        ("reservations.by_car_period", {
+            "find": "reservations",
+            "filter": {"voiture_id": some_id, "date_debut": {"$lte": now}, "date_fin": {"$gte": now}, "statut": active}
+        }),
+        ("reservations.calendar_window", {
+            "find": "reservations",
+            "filter": {"date_debut": {"$lte": now}, "date_fin": {"$gte": now}},
+            "sort": {"date_debut": 1}
+        }),
+        ("reservations.created_on", {
+            "find": "reservations", "filter": {"date_reservation": {"$gte": now, "$lte": now}}
+        }),
+        ("occupancy.is_free", {
+            "find": "occupancy", "filter": {"voiture_id": some_id, "day": {"$gte": now, "$lte": now}}, "limit": 1
+        }),
+        ("occupancy.busy_cars", {"distinct": "occupancy", "key": "voiture_id", "query": {"day": {"$gte": now, "$lte": now}}}),
+        ("occupancy.by_reservation", {"find": "occupancy", "filter": {"reservation_id": some_id}}),
+        ("voitures.search", {
+            "find": "voitures",
+            "filter": {"type_carburant": {"$in": ["Diesel"]}, "prix_journalier": {"$gte": 0, "$lte": 500}}
+        }),
+        ("voitures.search_options", {"find": "voitures", "filter": {"options": {"$all": ["GPS"]}}}),
+        ("clients.search_prefix", {
+            "find": "clients",
+            "filter": {"$or": [
+                {"CIN": {"$regex": "^AB12"}},
+                {"telephone": {"$regex": "^AB12"}},
+                {"numero_permis": {"$regex": "^AB12"}},
+                {"email": {"$regex": "^ab12"}},
+            ]},
+            "limit": 20
+        }),
+        ("clients.search_name_prefix", {
+            "find": "clients",
+            "filter": {"$or": [
+                {"nom_lc": {"$regex": "^benn"}},
+                {"prenom_lc": {"$regex": "^benn"}},
+            ]},
+            "sort": {"nom_lc": 1},
+            "limit": 20
+        }),
+        ("reservations.delete_by_client", {
+            "delete": "reservations", "deletes": [{"q": {"client_id": some_id}, "limit": 0}]
+        }),
+        ("reservations.delete_by_car", {
+            "delete": "reservations", "deletes": [{"q": {"voiture_id": some_id}, "limit": 0}]
+        }),
+    ]
+
+
+def _stages(plan):
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from _stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from _stages(item)
+
+
+def collscans():
+    """Retourne les noms des requetes chaudes dont le plan contient un COLLSCAN."""
+    failing = []
+    for name, command in hot_queries():
+        explain = mongo.db.command("explain", command, verbosity="queryPlanner")
+        if "COLLSCAN" in set(_stages(explain.get("queryPlanner", {}).get("winningPlan"))):
+            failing.append(name)
+    return failing
+
+
+@click.command("check-indexes")
+def check_indexes_command():
+    """Lance explain() sur les requetes chaudes et echoue en cas de COLLSCAN."""
+    failed = ensure_indexes()
+    if failed:
+        raise click.ClickException(f"Echec de creation des index: {', '.join(failed)}")
+    failing = collscans()
+    for name, _ in hot_queries():
+        click.echo(f"{'COLLSCAN' if name in failing else 'ok':<9} {name}")
+    if failing:
+        raise click.ClickException(f"{len(failing)} requete(s) en COLLSCAN")
@@ -0,0 +1,195 @@
+import bisect
+import threading
+import time
+from collections import defaultdict
+
+from flask import g, has_request_context, request
+from pymongo import monitoring
+
+# Bornes superieures des histogrammes, en millisecondes
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# Commandes dont le nom de collection est sous une autre cle
+COLLECTION_KEYS = {"getMore": "collection"}
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)  # derniere case: +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(BUCKETS_MS, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def to_dict(self):
+        cumulative, total = {}, 0
+        for bound, count in zip(BUCKETS_MS + ("+Inf",), self.counts):
+            total += count
+            cumulative[str(bound)] = total
+        return {"count": self.count, "sum_ms": round(self.sum, 3), "buckets": cumulative}
+
+
+def _returned(command_name, reply):
+    """Nombre de documents renvoyes (lectures) ou touches (ecritures)."""
+    cursor = reply.get("cursor")
+    if cursor is not None:
+        return len(cursor.get("firstBatch", cursor.get("nextBatch", [])))
+    if command_name == "distinct":
+        return len(reply.get("values", []))
+    if command_name == "findAndModify":
+        return 1 if reply.get("value") else 0
+    return reply.get("n", 0)
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """Attribue chaque commande Mongo a la requete Flask en cours (flask.g).
+
+    Le client pymongo synchrone appelle le listener dans le thread qui
+    execute la commande, donc dans le contexte de la requete. Les commandes
+    hors requete (threads de fond, CLI) ne comptent que par collection.
+    """
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+        self._lock = threading.Lock()
+        self._pending = {}  # request_id -> collection
+
+    def started(self, event):
+        key = COLLECTION_KEYS.get(event.command_name, event.command_name)
+        collection = event.command.get(key)
+        with self._lock:
+            self._pending[event.request_id] = collection if isinstance(collection, str) else None
+
+    def _finish(self, event, returned):
+        with self._lock:
+            collection = self._pending.pop(event.request_id, None)
+        duration_ms = event.duration_micros / 1000
+        self.metrics.observe_command(collection, event.command_name, duration_ms, returned)
+        if has_request_context():
+            commands = g.setdefault("mongo_commands", [])
+            commands.append((collection, event.command_name, duration_ms, returned))
+
+    def succeeded(self, event):
+        self._finish(event, _returned(event.command_name, event.reply))
+
+    def failed(self, event):
+        self._finish(event, 0)
+
+
+class Metrics:
+    """Histogrammes de latence par route et par (collection, commande).
+
+    Propres a chaque worker; exposes par /admin/metrics.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._routes = defaultdict(lambda: {"latency": Histogram(), "mongo": Histogram(), "commands": 0})
+        self._collections = defaultdict(lambda: {"latency": Histogram(), "returned": 0})
+        self.listener = MongoCommandListener(self)
+
+    def init_app(self, app):
+        """A appeler apres mongo.init_app(app, **metrics.client_options(app))."""
+        self.enabled = app.config.get("INSTRUMENTATION_ENABLED", False)
+        if self.enabled:
+            app.before_request(self._start)
+            app.after_request(self._finish)
+
+    def client_options(self, app):
+        """Arguments supplementaires du MongoClient (le listener doit y etre passe)."""
+        if app.config.get("INSTRUMENTATION_ENABLED", False):
+            return {"event_listeners": [self.listener]}
+        return {}
+
+    def observe_command(self, collection, command_name, duration_ms, returned):
+        if not self.enabled:
+            return
+        with self._lock:
+            entry = self._collections[(collection or "-", command_name)]
+            entry["latency"].observe(duration_ms)
+            entry["returned"] += returned
+
+    def _start(self):
+        g.request_started = time.perf_counter()
+
+    def _finish(self, response):
+        started = g.get("request_started")
+        if started is None:
+            return response
+        total_ms = (time.perf_counter() - started) * 1000
+        commands = g.get("mongo_commands", [])
+        mongo_ms = sum(command[2] for command in commands)
+
+        route = f"{request.method} {request.url_rule.rule if request.url_rule else '<404>'}"
+        with self._lock:
+            entry = self._routes[route]
+            entry["latency"].observe(total_ms)
+            entry["mongo"].observe(mongo_ms)
+            entry["commands"] += len(commands)
+
+        # Le corps des reponses streamees (export, images) n'est pas compte
+        response.headers.add(
+            "Server-Timing",
+            f'mongo;dur={mongo_ms:.1f};desc="{len(commands)} cmd", app;dur={total_ms:.1f}'
+        )
+        return response
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "buckets_ms": list(BUCKETS_MS),
+                "routes": {
+                    route: {
+                        "latency": entry["latency"].to_dict(),
+                        "mongo": entry["mongo"].to_dict(),
+                        "mongo_commands": entry["commands"],
+                    }
+                    for route, entry in sorted(self._routes.items())
+                },
+                "collections": {
+                    f"{collection}.{command}": {
+                        "latency": entry["latency"].to_dict(),
+                        "returned": entry["returned"],
+                    }
+                    for (collection, command), entry in sorted(self._collections.items())
+                },
+            }
+
+    def prometheus(self):
+        """Format texte Prometheus (une serie par route et par collection)."""
+        snapshot = self.snapshot()
+        lines = []
+
+        def histogram(name, labels, data):
+            for bound, count in data["buckets"].items():
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f"{name}_sum{{{labels}}} {data['sum_ms']}")
+            lines.append(f"{name}_count{{{labels}}} {data['count']}")
+
+        lines.append("# TYPE http_request_duration_ms histogram")
+        for route, entry in snapshot["routes"].items():
+            histogram("http_request_duration_ms", f'route="{route}"', entry["latency"])
+        lines.append("# TYPE http_request_mongo_duration_ms histogram")
+        for route, entry in snapshot["routes"].items():
+            histogram("http_request_mongo_duration_ms", f'route="{route}"', entry["mongo"])
+        lines.append("# TYPE http_request_mongo_commands_total counter")
+        for route, entry in snapshot["routes"].items():
+            lines.append(f'http_request_mongo_commands_total{{route="{route}"}} {entry["mongo_commands"]}')
+        lines.append("# TYPE mongo_command_duration_ms histogram")
+        for name, entry in snapshot["collections"].items():
+            collection, command = name.rsplit(".", 1)
+            histogram("mongo_command_duration_ms", f'collection="{collection}",command="{command}"', entry["latency"])
+        lines.append("# TYPE mongo_documents_returned_total counter")
+        for name, entry in snapshot["collections"].items():
+            collection, command = name.rsplit(".", 1)
+            lines.append(
+                f'mongo_documents_returned_total{{collection="{collection}",command="{command}"}} {entry["returned"]}'
+            )
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
@@ -0,0 +1,51 @@
+import logging
+import time
+
+import click
+from flask import current_app
+from utils.snapshots import run_snapshots, seconds_until_hour
+from utils.stats import counters
+
+logger = logging.getLogger(__name__)
+
+
+def scheduled_jobs(app):
+    """[(nom, fonction, delai avant la prochaine execution)] des taches activees."""
+    jobs = []
+    reconcile_seconds = app.config.get("STATS_RECONCILE_SECONDS", 300)
+    if reconcile_seconds > 0:
+        jobs.append(("counters", counters.reconcile, lambda: reconcile_seconds))
+    if app.config.get("SNAPSHOT_JOB_ENABLED"):
+        hour = app.config.get("SNAPSHOT_HOUR", 2)
+        jobs.append(("snapshots", run_snapshots, lambda: seconds_until_hour(hour)))
+    return jobs
+
+
+def run_jobs(app, jobs):
+    """Lance chaque tache tout de suite, puis a chaque echeance, jusqu'a l'arret."""
+    due = {name: time.monotonic() for name, _, _ in jobs}
+    while True:
+        name, job, next_delay = min(jobs, key=lambda job: due[job[0]])
+        time.sleep(max(due[name] - time.monotonic(), 0))
+        with app.app_context():
+            try:
+                job()
+                logger.info("Job done", extra={"job": name})
+            except Exception:
+                logger.exception("Job failed", extra={"job": name})
+        due[name] = time.monotonic() + next_delay()
+
+
+@click.command("run-jobs")
+def run_jobs_command():
+    """Execute les taches periodiques (compteurs, snapshots) jusqu'a l'arret.
+
+    A lancer dans un seul processus: create_app ne demarre aucune tache,
+    ni dans les workers gunicorn ni dans les autres commandes.
+    """
+    app = current_app._get_current_object()
+    jobs = scheduled_jobs(app)
+    if not jobs:
+        raise click.ClickException("Aucune tache activee (STATS_RECONCILE_SECONDS, SNAPSHOT_JOB_ENABLED)")
+    click.echo(f"taches: {', '.join(name for name, _, _ in jobs)}")
+    run_jobs(app, jobs)
@@ -0,0 +1,48 @@
+import json
+from datetime import date, datetime
+
+from bson import ObjectId
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson absent: on retombe sur le module json standard
+    orjson = None
+
+
+def _default(value):
+    # orjson gere deja datetime/date; ObjectId, Decimal128, etc. passent en str
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def dumps_bytes(obj):
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def dumps(obj):
+    return dumps_bytes(obj).decode("utf-8")
+
+
+class MongoJSONProvider(JSONProvider):
+    """Serialise directement ObjectId et dates (ISO 8601) dans jsonify."""
+
+    mimetype = "application/json"
+
+    def dumps(self, obj, **kwargs):
+        return dumps(obj)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        # Pas de passage par str: les bytes d'orjson vont directement dans la reponse
+        return self._app.response_class(dumps_bytes(obj) + b"\n", mimetype=self.mimetype)
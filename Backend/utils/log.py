@@ -0,0 +1,119 @@
+import atexit
+import json
+import logging
+import queue
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from flask import g, has_request_context, request
+from flask.logging import default_handler
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+# Attributs standard d'un LogRecord: tout le reste vient de extra={...}
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+access_logger = logging.getLogger("access")
+
+
+class JsonFormatter(logging.Formatter):
+    """Une ligne JSON par record, avec le contexte de la requete en cours."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if has_request_context():
+            entry["request_id"] = g.get("request_id")
+            entry["method"] = request.method
+            entry["route"] = request.url_rule.rule if request.url_rule else request.path
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_FIELDS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler qui ne bloque jamais: si la file est pleine, le record est perdu."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class StructuredLogging:
+    """Logs JSON ecrits par un thread dedie (QueueListener).
+
+    Le formatage a lieu dans le thread de la requete (le contexte Flask y
+    est disponible); seule l'ecriture sur stdout, qui peut bloquer sur un
+    pipe lent, est deleguee. Chaque requete recoit un request id (repris de
+    X-Request-ID s'il est fourni) et une ligne d'acces avec sa latence.
+    """
+
+    def __init__(self):
+        self.handler = None
+        self.listener = None
+        self.access_log = True
+
+    def init_app(self, app):
+        self.access_log = app.config.get("LOG_ACCESS", True)
+        if self.listener is None:
+            atexit.register(self.stop)
+        else:
+            self.listener.stop()
+
+        log_queue = queue.Queue(app.config.get("LOG_QUEUE_SIZE", 10000))
+        self.handler = DroppingQueueHandler(log_queue)
+        self.handler.setFormatter(JsonFormatter())
+        self.listener = QueueListener(log_queue, logging.StreamHandler(sys.stdout))
+        self.listener.start()
+
+        root = logging.getLogger()
+        root.handlers = [self.handler]
+        root.setLevel(app.config.get("LOG_LEVEL", "INFO"))
+        # LOG_LEVELS="pymongo=WARNING,werkzeug=INFO"
+        for item in filter(None, app.config.get("LOG_LEVELS", "").split(",")):
+            name, _, level = item.partition("=")
+            logging.getLogger(name.strip()).setLevel(level.strip().upper())
+        app.logger.removeHandler(default_handler)
+
+        app.before_request(self._start)
+        app.after_request(self._finish)
+
+    def stop(self):
+        """Vide la file avant l'arret du processus."""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+    def _start(self):
+        g.request_id = request.headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex
+        g.log_started = time.perf_counter()
+
+    def _finish(self, response):
+        response.headers[REQUEST_ID_HEADER] = g.get("request_id", "")
+        started = g.get("log_started")
+        if self.access_log and started is not None:
+            access_logger.info("request", extra={
+                "path": request.full_path.rstrip("?"),
+                "status": response.status_code,
+                "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+            })
+        return response
+
+
+logs = StructuredLogging()
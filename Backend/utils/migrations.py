@@ -0,0 +1,102 @@
+import click
+from pymongo import UpdateOne
+from db import mongo
+from utils.dates import to_datetime
+from utils.indexes import ensure_indexes
+from utils.names import name_keys
+
+BATCH_SIZE = 500
+
+# Champs date stockes en string dans les anciennes donnees
+DATE_FIELDS = {
+    "reservations": ["date_debut", "date_fin", "date_reservation", "paiement.date_paiement"],
+    "clients": ["date_expiration", "date_ajout"],
+    "voitures": ["date_ajout", "date_modification"],
+}
+# Horodatages: l'heure est conservee (les autres champs sont des jours)
+TIMESTAMP_FIELDS = {"date_ajout", "date_modification", "paiement.date_paiement"}
+
+
+def _get_field(doc, path):
+    for key in path.split("."):
+        if not isinstance(doc, dict):
+            return None
+        doc = doc.get(key)
+    return doc
+
+
+def migrate_collection_dates(collection, fields):
+    """Remplace les dates string par des dates BSON. Idempotent.
+
+    Les valeurs illisibles ("" ou format inconnu) sont laissees telles quelles;
+    retourne (documents convertis, {champ: [_id des valeurs illisibles]}).
+    """
+    query = {"$or": [{field: {"$type": "string"}} for field in fields]}
+    projection = {field: 1 for field in fields}
+
+    converted = 0
+    unparsed = {}
+    operations = []
+    for doc in collection.find(query, projection).batch_size(BATCH_SIZE):
+        updates = {}
+        for field in fields:
+            value = _get_field(doc, field)
+            if isinstance(value, str):
+                parsed = to_datetime(value, keep_time=field in TIMESTAMP_FIELDS)
+                if parsed is None:
+                    unparsed.setdefault(field, []).append(doc["_id"])
+                else:
+                    updates[field] = parsed
+        if updates:
+            operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": updates}))
+        if len(operations) >= BATCH_SIZE:
+            converted += collection.bulk_write(operations, ordered=False).modified_count
+            operations = []
+
+    if operations:
+        converted += collection.bulk_write(operations, ordered=False).modified_count
+    return converted, unparsed
+
+
+def migrate_dates():
+    results = {}
+    for name, fields in DATE_FIELDS.items():
+        results[name] = migrate_collection_dates(mongo.db[name], fields)
+
+    # Index de plage sur les dates (voir utils/indexes.py)
+    ensure_indexes(["reservations"])
+    return results
+
+
+@click.command("migrate-dates")
+def migrate_dates_command():
+    """Convertit toutes les dates stockees en dates BSON et cree les index de plage."""
+    results = migrate_dates()
+    for name, (count, unparsed) in results.items():
+        click.echo(f"{name}: {count} document(s) converti(s)")
+        for field, ids in unparsed.items():
+            click.echo(f"  {field}: {len(ids)} valeur(s) illisible(s) laissee(s) en l'etat: {', '.join(map(str, ids))}")
+
+
+def migrate_client_names():
+    """Renseigne nom_lc / prenom_lc de tous les clients. Idempotent; retourne le nombre de mises a jour."""
+    updated = 0
+    operations = []
+    for doc in mongo.db.clients.find({}, {"nom": 1, "prenom": 1, "nom_lc": 1, "prenom_lc": 1}).batch_size(BATCH_SIZE):
+        keys = name_keys(doc.get("nom"), doc.get("prenom"))
+        if any(doc.get(field) != value for field, value in keys.items()):
+            operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": keys}))
+        if len(operations) >= BATCH_SIZE:
+            updated += mongo.db.clients.bulk_write(operations, ordered=False).modified_count
+            operations = []
+
+    if operations:
+        updated += mongo.db.clients.bulk_write(operations, ordered=False).modified_count
+    ensure_indexes(["clients"])
+    return updated
+
+
+@click.command("migrate-client-names")
+def migrate_client_names_command():
+    """Renseigne les noms normalises utilises par /manager/clients/search."""
+    click.echo(f"clients: {migrate_client_names()} document(s) mis a jour")
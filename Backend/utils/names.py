@@ -0,0 +1,8 @@
+def name_key(value):
+    """Forme de recherche d'un nom: minuscules, sans espaces autour."""
+    return value.strip().lower() if isinstance(value, str) else None
+
+
+def name_keys(nom, prenom):
+    """Champs nom_lc / prenom_lc, indexes pour la recherche par debut de nom."""
+    return {"nom_lc": name_key(nom), "prenom_lc": name_key(prenom)}
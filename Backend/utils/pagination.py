@@ -0,0 +1,84 @@
+from bson import ObjectId
+from flask import abort, jsonify, make_response, request
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+
+def _bad_request(message):
+    abort(make_response(jsonify({"error": message}), 400))
+
+
+def wants_all():
+    """?all=1 conserve l'ancien format (tableau complet, sans pagination)."""
+    return request.args.get("all", "").lower() in ("1", "true", "yes")
+
+
+def requested_projection(base=None):
+    """Projection Mongo construite depuis ?fields=a,b,c.
+
+    Si `base` est fourni, seuls ses champs peuvent etre demandes.
+    """
+    fields = [f.strip() for f in request.args.get("fields", "").split(",") if f.strip()]
+    if not fields:
+        return base
+
+    if base is not None:
+        fields = [f for f in fields if base.get(f)]
+    projection = {field: 1 for field in fields}
+    projection["_id"] = 1
+    return projection
+
+
+def requested_limit(default=DEFAULT_LIMIT, maximum=MAX_LIMIT):
+    """Taille de page (?limit=N), bornee a `maximum`."""
+    try:
+        limit = int(request.args.get("limit", default))
+    except ValueError:
+        _bad_request("Invalid limit")
+    if limit < 1:
+        _bad_request("Invalid limit")
+    return min(limit, maximum)
+
+
+def requested_page():
+    """Numero de page (?page=N, a partir de 1) pour les listes non triees par _id."""
+    try:
+        page = int(request.args.get("page", 1))
+    except ValueError:
+        _bad_request("Invalid page")
+    if page < 1:
+        _bad_request("Invalid page")
+    return page
+
+
+def fetch_page(collection, query=None, projection=None):
+    """Pagination par _id (keyset): ?limit=N&after=<dernier _id>.
+
+    Retourne (documents, next_cursor); next_cursor vaut None sur la derniere page.
+    """
+    query = dict(query or {})
+    if wants_all():
+        return list(collection.find(query, projection)), None
+
+    limit = requested_limit()
+
+    after = request.args.get("after")
+    if after:
+        if not ObjectId.is_valid(after):
+            _bad_request("Invalid cursor")
+        query["_id"] = {"$gt": ObjectId(after)}
+
+    # Un document de plus pour savoir s'il reste une page
+    docs = list(collection.find(query, projection).sort("_id", 1).limit(limit + 1))
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = str(docs[-1]["_id"])
+    return docs, next_cursor
+
+
+def page_response(items, next_cursor):
+    if wants_all():
+        return jsonify(items)
+    return jsonify({"items": items, "next_cursor": next_cursor})
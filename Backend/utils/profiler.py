@@ -0,0 +1,173 @@
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from bson import ObjectId
+from flask import g, request, session
+from pymongo.errors import CollectionInvalid
+from db import mongo
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile"
+# Taille maximale de la collection capped des profils
+PROFILES_MAX_BYTES = 64 * 1024 * 1024
+
+
+class SamplingProfiler:
+    """Profil statistique de requetes choisies, en piles "collapsed".
+
+    Une requete est profilee avec une probabilite PROFILE_SAMPLE_RATE, ou
+    si elle porte l'en-tete X-Profile et une session admin. Un thread
+    unique releve toutes les PROFILE_INTERVAL_MS la pile des threads des
+    requetes profilees (sys._current_frames). Les PROFILE_BUFFER_SIZE
+    derniers profils de tous les workers sont gardes dans la collection
+    capped profiles; la lecture les rend au format attendu par
+    flamegraph.pl et speedscope ("f1;f2;f3 nombre").
+    """
+
+    def __init__(self):
+        self.sample_rate = 0.0
+        self.interval = 0.005
+        self.root_path = ""
+        self._lock = threading.Lock()
+        self._active = {}  # ident du thread -> Counter des piles
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def init_app(self, app):
+        self.sample_rate = app.config.get("PROFILE_SAMPLE_RATE", self.sample_rate)
+        self.interval = app.config.get("PROFILE_INTERVAL_MS", 5) / 1000
+        self.root_path = os.path.dirname(app.root_path)
+        with app.app_context():
+            try:
+                mongo.db.create_collection(
+                    "profiles", capped=True, size=PROFILES_MAX_BYTES, max=app.config.get("PROFILE_BUFFER_SIZE", 100)
+                )
+            except CollectionInvalid:
+                pass  # Deja creee (par un autre worker)
+            except Exception:
+                logger.exception("Error creating profiles collection")
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.teardown_request(self._discard)
+
+    def _wanted(self):
+        if request.headers.get(PROFILE_HEADER) and "admin_id" in session:
+            return "header"
+        if self.sample_rate and random.random() < self.sample_rate:
+            return "sample"
+        return None
+
+    def _start(self):
+        trigger = self._wanted()
+        if trigger is None:
+            return
+        with self._lock:
+            self._active[threading.get_ident()] = Counter()
+        g.profile = (trigger, time.perf_counter(), datetime.utcnow())
+        self._ensure_sampler()
+        self._wakeup.set()
+
+    def _finish(self, response):
+        profile = g.pop("profile", None)
+        if profile is None:
+            return response
+        with self._lock:
+            stacks = self._active.pop(threading.get_ident(), Counter())
+        trigger, started, started_at = profile
+        profile_id = ObjectId()
+        try:
+            mongo.db.profiles.insert_one({
+                "_id": profile_id,
+                "method": request.method,
+                "route": request.url_rule.rule if request.url_rule else None,
+                "path": request.full_path.rstrip("?"),
+                "status": response.status_code,
+                "trigger": trigger,
+                "started_at": started_at,
+                "duration_ms": (time.perf_counter() - started) * 1000,
+                "samples": sum(stacks.values()),
+                "pid": os.getpid(),
+                # Liste plutot que dict: les piles contiennent des "."
+                "stacks": [[stack, count] for stack, count in stacks.items()],
+            })
+        except Exception:
+            logger.exception("Error saving profile")
+            return response
+        response.headers["X-Profile-Id"] = str(profile_id)
+        return response
+
+    def _discard(self, error=None):
+        # Requete interrompue avant after_request
+        with self._lock:
+            self._active.pop(threading.get_ident(), None)
+
+    # --- Echantillonnage ---
+
+    def _ensure_sampler(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._sample_loop, name="profiler", daemon=True)
+                    self._thread.start()
+
+    def _sample_loop(self):
+        while True:
+            with self._lock:
+                idle = not self._active
+            if idle:
+                self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self._lock:
+                for ident, stacks in self._active.items():
+                    frame = frames.get(ident)
+                    if frame is not None:
+                        stacks[self._collapse(frame)] += 1
+
+    def _location(self, code):
+        path = code.co_filename
+        if path.startswith(self.root_path):
+            path = os.path.relpath(path, self.root_path)
+        elif "site-packages" + os.sep in path:
+            path = path.split("site-packages" + os.sep, 1)[1]
+        return f"{code.co_name} ({path}:{code.co_firstlineno})"
+
+    def _collapse(self, frame):
+        names = []
+        while frame is not None:
+            names.append(self._location(frame.f_code))
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    # --- Lecture ---
+
+    def summaries(self):
+        return [
+            {"id": profile.pop("_id"), **profile}
+            for profile in mongo.db.profiles.find({}, {"stacks": 0}).sort("$natural", 1)
+        ]
+
+    def collapsed(self, profile_id=None, route=None):
+        """Piles fusionnees d'un profil, ou de tous ceux d'une route (ou de la collection)."""
+        query = {}
+        if profile_id is not None:
+            query["_id"] = ObjectId(profile_id)
+        if route is not None:
+            query["route"] = route
+        merged = Counter()
+        for profile in mongo.db.profiles.find(query, {"stacks": 1}):
+            for stack, count in profile["stacks"]:
+                merged[stack] += count
+        return "".join(f"{stack} {count}\n" for stack, count in merged.most_common())
+
+
+profiler = SamplingProfiler()
@@ -0,0 +1,145 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from functools import wraps
+from urllib.parse import urlencode
+
+from flask import Response, make_response, request
+from db import mongo
+
+logger = logging.getLogger(__name__)
+
+# Tags utilises par les handlers d'ecriture
+VOITURES = "voitures"
+CLIENTS = "clients"
+RESERVATIONS = "reservations"
+
+
+class MemoryBackend:
+    """LRU en memoire du processus, avec expiration (TTL)."""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # cle -> (expire_a, body, mimetype, tags)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1], entry[2]
+
+    def set(self, key, body, mimetype, tags, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, body, mimetype, set(tags))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, tags):
+        with self._lock:
+            for key in [k for k, entry in self._entries.items() if entry[3] & tags]:
+                del self._entries[key]
+
+
+class MongoBackend:
+    """Cache partage entre workers dans la collection response_cache.
+
+    L'expiration est faite par l'index TTL sur expires_at (voir utils/indexes.py).
+    """
+
+    collection_name = "response_cache"
+
+    def get(self, key):
+        entry = mongo.db[self.collection_name].find_one(
+            {"_id": key, "expires_at": {"$gt": datetime.utcnow()}}
+        )
+        if entry is None:
+            return None
+        return entry["body"], entry["mimetype"]
+
+    def set(self, key, body, mimetype, tags, ttl):
+        mongo.db[self.collection_name].replace_one({"_id": key}, {
+            "body": body,
+            "mimetype": mimetype,
+            "tags": list(tags),
+            "expires_at": datetime.utcnow() + timedelta(seconds=ttl)
+        }, upsert=True)
+
+    def invalidate(self, tags):
+        mongo.db[self.collection_name].delete_many({"tags": {"$in": list(tags)}})
+
+
+class ResponseCache:
+    """Cache des reponses GET, cle = route + query string triee + versions des tags.
+
+    Les versions des collections (utils/versions.py) sont lues dans Mongo
+    avant d'executer la vue: apres une ecriture (versions.bump()), aucun
+    worker ne relit une entree calculee avant elle, meme si un lecteur
+    concurrent la stocke apres l'invalidation. L'invalidation par tags ne
+    fait que liberer la place. RESPONSE_CACHE_BACKEND=mongo partage le
+    cache entre workers (une seule execution de la vue par version).
+    """
+
+    def __init__(self):
+        self.backend = MemoryBackend()
+        self.default_ttl = 60
+
+    def init_app(self, app):
+        self.default_ttl = app.config.get("RESPONSE_CACHE_TTL", self.default_ttl)
+        if app.config.get("RESPONSE_CACHE_BACKEND") == "mongo":
+            self.backend = MongoBackend()
+        else:
+            self.backend = MemoryBackend(app.config.get("RESPONSE_CACHE_MAX_ENTRIES", 1024))
+
+    def invalidate(self, *tags):
+        try:
+            self.backend.invalidate(set(tags))
+        except Exception:
+            logger.exception("Error invalidating response cache")
+
+    def cached(self, *tags, ttl=None):
+        """Met en cache les reponses 200 d'une vue GET, par route et query string."""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if request.method != "GET":
+                    return view(*args, **kwargs)
+
+                # versions importe ce module
+                from utils.versions import versions
+
+                state = ",".join(f"{name}:{version}" for name, version, _ in versions.current(tags))
+                key = request.path + "?" + urlencode(sorted(request.args.items(multi=True))) + "#" + state
+                try:
+                    hit = self.backend.get(key)
+                except Exception:
+                    # Cache indisponible: la vue repond sans cache
+                    logger.exception("Error reading response cache")
+                    hit = None
+                if hit is not None:
+                    response = Response(hit[0], mimetype=hit[1])
+                    response.headers["X-Cache"] = "HIT"
+                    return response
+
+                response = make_response(view(*args, **kwargs))
+                if response.status_code == 200 and not response.is_streamed:
+                    try:
+                        self.backend.set(key, response.get_data(), response.mimetype, tags, ttl or self.default_ttl)
+                    except Exception:
+                        # Ex.: DocumentTooLarge sur une grosse liste avec le backend mongo
+                        logger.exception("Error writing response cache")
+                response.headers["X-Cache"] = "MISS"
+                return response
+            return wrapper
+        return decorator
+
+
+response_cache = ResponseCache()
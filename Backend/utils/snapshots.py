@@ -0,0 +1,147 @@
+from datetime import datetime, time, timedelta
+
+import click
+from pymongo import ReplaceOne
+from db import mongo
+from utils.analytics import AMOUNT, changed_days, rebuild_rollup, rebuild_rollup_days
+from utils.availability import ACTIVE_STATUSES
+from utils.dates import to_datetime, today
+
+PAID = "payée"
+
+
+def _by_day(collection, match, day, fields):
+    """{jour: {champ: valeur}} depuis un $group par jour."""
+    pipeline = [
+        {"$match": match},
+        {"$group": {"_id": day, **fields}},
+    ]
+    return {row.pop("_id"): row for row in collection.aggregate(pipeline)}
+
+
+def compute_snapshots(start, end):
+    """Un document par jour de start a end inclus (datetime a minuit).
+
+    - cars_rented: voitures ayant un jour dans occupancy (reservations actives)
+    - new_reservations / revenue_booked: reservations creees ce jour-la
+      (date_reservation); le montant ne compte que celles encore actives
+    - cancellations: reservations sorties des statuts actifs ce jour-la
+      (date_statut, a defaut date_reservation)
+    - revenue_paid: paiement.statut "payée", au jour de paiement.date_paiement
+      (a defaut date_reservation)
+    """
+    period = {"$gte": start, "$lte": end}
+    active = list(ACTIVE_STATUSES)
+
+    rented = _by_day(mongo.db.occupancy, {"day": period}, "$day", {"cars": {"$sum": 1}})
+    created = _by_day(
+        mongo.db.reservations, {"date_reservation": period}, "$date_reservation",
+        {
+            "count": {"$sum": 1},
+            "revenue": {"$sum": {"$cond": [{"$in": ["$statut", active]}, AMOUNT, 0]}},
+        }
+    )
+    cancelled = _by_day(
+        mongo.db.reservations,
+        {"statut": {"$nin": active}, "$or": [
+            {"date_statut": period},
+            {"date_statut": {"$exists": False}, "date_reservation": period},
+        ]},
+        {"$ifNull": ["$date_statut", "$date_reservation"]},
+        {"count": {"$sum": 1}}
+    )
+    paid = _by_day(
+        mongo.db.reservations,
+        {"paiement.statut": PAID, "$or": [
+            {"paiement.date_paiement": period},
+            {"paiement.date_paiement": {"$exists": False}, "date_reservation": period},
+        ]},
+        {"$ifNull": ["$paiement.date_paiement", "$date_reservation"]},
+        {"revenue": {"$sum": AMOUNT}}
+    )
+
+    # La flotte n'est pas historisee: nombre de voitures au moment du calcul
+    fleet = mongo.db.voitures.count_documents({})
+    computed_at = datetime.utcnow()
+    snapshots = []
+    day = start
+    while day <= end:
+        cars_rented = rented.get(day, {}).get("cars", 0)
+        snapshots.append({
+            "_id": day,
+            "cars_total": fleet,
+            "cars_rented": cars_rented,
+            "cars_available": max(fleet - cars_rented, 0),
+            "new_reservations": created.get(day, {}).get("count", 0),
+            "cancellations": cancelled.get(day, {}).get("count", 0),
+            "revenue_booked": created.get(day, {}).get("revenue", 0),
+            "revenue_paid": paid.get(day, {}).get("revenue", 0),
+            "computed_at": computed_at,
+        })
+        day += timedelta(days=1)
+    return snapshots
+
+
+def _first_day():
+    """Jour suivant le dernier snapshot, sinon la premiere reservation."""
+    last = mongo.db.daily_snapshots.find_one({}, {"_id": 1}, sort=[("_id", -1)])
+    if last is not None:
+        return last["_id"] + timedelta(days=1)
+    first = mongo.db.reservations.find_one(
+        {"date_reservation": {"$type": "date"}}, {"date_reservation": 1}, sort=[("date_reservation", 1)]
+    )
+    return first["date_reservation"] if first else today()
+
+
+def _last_run():
+    """Debut du jour du dernier calcul de snapshots, ou None."""
+    last = mongo.db.daily_snapshots.find_one({}, {"computed_at": 1}, sort=[("computed_at", -1)])
+    if last is None or last.get("computed_at") is None:
+        return None
+    return datetime.combine(last["computed_at"].date(), time.min)
+
+
+def run_snapshots(start=None, end=None):
+    """Ecrit les snapshots manquants (ou ceux de [start, end]) et rafraichit analytics_daily.
+
+    Seuls les jours termines sont traites; relancer est sans effet
+    (upsert par jour). Le rollup est aussi recalcule pour les jours
+    anterieurs dont une reservation a change depuis le dernier passage.
+    Retourne le nombre de jours ecrits.
+    """
+    yesterday = today() - timedelta(days=1)
+    start = start or _first_day()
+    end = min(end, yesterday) if end else yesterday
+    if start > end:
+        return 0
+
+    # Jour entier: date_statut et date_paiement sont dates au jour
+    since = _last_run()
+    if since is not None:
+        rebuild_rollup_days(day for day in changed_days(since) if day < start)
+
+    snapshots = compute_snapshots(start, end)
+    mongo.db.daily_snapshots.bulk_write(
+        [ReplaceOne({"_id": doc["_id"]}, doc, upsert=True) for doc in snapshots], ordered=False
+    )
+    # Les reservations creees sur la periode peuvent commencer plus tard
+    rebuild_rollup(start)
+    return len(snapshots)
+
+
+def seconds_until_hour(hour):
+    """Delai avant le prochain passage a hour:00 (heure locale)."""
+    now = datetime.now()
+    next_run = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+    if next_run <= now:
+        next_run += timedelta(days=1)
+    return (next_run - now).total_seconds()
+
+
+@click.command("snapshot-days")
+@click.option("--from", "start", help="Recalcule a partir de ce jour (YYYY-MM-DD); par defaut apres le dernier snapshot.")
+@click.option("--to", "end", help="Dernier jour (YYYY-MM-DD); par defaut hier.")
+def snapshot_days_command(start, end):
+    """Ecrit les snapshots quotidiens (flotte, reservations, chiffre d'affaires)."""
+    count = run_snapshots(to_datetime(start) if start else None, to_datetime(end) if end else None)
+    click.echo(f"daily_snapshots: {count} jour(s) ecrit(s)")
@@ -0,0 +1,76 @@
+import logging
+from datetime import datetime
+
+import click
+from db import mongo
+from utils.availability import ACTIVE_STATUSES, availability
+from utils.dates import today
+
+logger = logging.getLogger(__name__)
+
+COUNTERS_ID = "dashboard"
+
+
+class DashboardCounters:
+    """Compteurs du tableau de bord.
+
+    Les totaux sont materialises dans un seul document de la collection
+    dashboard_counters, partage par tous les workers et mis a jour par $inc
+    a chaque insertion/suppression; `flask reconcile-counters` (ou le job
+    counters de `flask run-jobs`) les recale apres une ecriture hors API.
+    Clients actifs et voitures louees dependent du jour: ils sont comptes a
+    la lecture, par un distinct indexe.
+    """
+
+    @property
+    def collection(self):
+        return mongo.db.dashboard_counters
+
+    def init_app(self, app):
+        # Premier demarrage: le document doit exister avant la premiere lecture
+        with app.app_context():
+            try:
+                if self.collection.find_one({"_id": COUNTERS_ID}, {"_id": 1}) is None:
+                    self.reconcile()
+            except Exception:
+                logger.exception("Error loading dashboard counters")
+
+    def reconcile(self):
+        self.collection.replace_one({"_id": COUNTERS_ID}, {
+            "total_cars": mongo.db.voitures.count_documents({}),
+            "total_clients": mongo.db.clients.count_documents({}),
+            "total_reservations": mongo.db.reservations.count_documents({}),
+            "reconciled_at": datetime.utcnow(),
+        }, upsert=True)
+
+    def increment(self, field, delta=1):
+        self.collection.update_one({"_id": COUNTERS_ID}, {"$inc": {field: delta}}, upsert=True)
+
+    # --- Lecture ---
+
+    def active_clients(self, day):
+        return len(mongo.db.reservations.distinct("client_id", {
+            "date_fin": {"$gte": day},
+            "statut": {"$in": list(ACTIVE_STATUSES)}
+        }))
+
+    def snapshot(self):
+        doc = self.collection.find_one({"_id": COUNTERS_ID}) or {}
+        day = today()
+        stats = {
+            field: doc.get(field, 0)
+            for field in ("total_cars", "total_clients", "total_reservations")
+        }
+        stats["active_clients"] = self.active_clients(day)
+        stats["rented_cars"] = len(availability.busy_cars(day))
+        return stats
+
+
+counters = DashboardCounters()
+
+
+@click.command("reconcile-counters")
+def reconcile_counters_command():
+    """Recalcule les compteurs du tableau de bord depuis les collections."""
+    counters.reconcile()
+    click.echo(f"dashboard_counters: {counters.snapshot()}")
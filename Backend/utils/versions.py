@@ -0,0 +1,131 @@
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone
+from functools import wraps
+
+from flask import Response, g, has_request_context, make_response, request
+from db import mongo
+from utils.dates import today
+from utils.response_cache import CLIENTS, RESERVATIONS, VOITURES, response_cache
+
+logger = logging.getLogger(__name__)
+
+TRACKED_COLLECTIONS = (VOITURES, CLIENTS, RESERVATIONS)
+EPOCH = datetime(1970, 1, 1)
+
+
+def _utc(value):
+    # Les dates Mongo sont naives en UTC; HTTP compare a la seconde pres
+    return value.replace(tzinfo=timezone.utc, microsecond=0)
+
+
+class CollectionVersions:
+    """Numero de version et date de modification par collection.
+
+    Chaque handler d'ecriture appelle bump(); l'etat est stocke dans la
+    collection collection_versions et relu une fois par requete (current()),
+    avant la vue: ETag et cle du cache de reponses derivent du meme etat.
+    """
+
+    def init_app(self, app):
+        with app.app_context():
+            try:
+                now = datetime.utcnow()
+                for name in TRACKED_COLLECTIONS:
+                    mongo.db.collection_versions.update_one(
+                        {"_id": name},
+                        {"$setOnInsert": {"version": 0, "modified_at": now}},
+                        upsert=True
+                    )
+            except Exception:
+                logger.exception("Error loading collection versions")
+
+    def current(self, collections):
+        """[(collection, version, modified_at)] lus dans Mongo, une fois par requete.
+
+        A lire avant de calculer une reponse: elle reflete alors au moins cet etat.
+        """
+        states = g.setdefault("collection_versions", {}) if has_request_context() else {}
+        missing = [name for name in collections if name not in states]
+        if missing:
+            for doc in mongo.db.collection_versions.find({"_id": {"$in": missing}}):
+                states[doc["_id"]] = (doc["version"], doc["modified_at"])
+            for name in missing:
+                states.setdefault(name, (0, EPOCH))
+        return [(name, *states[name]) for name in collections]
+
+    def bump(self, *collections):
+        """A appeler apres chaque ecriture; invalide aussi le cache de reponses."""
+        try:
+            now = datetime.utcnow()
+            for name in collections:
+                mongo.db.collection_versions.update_one(
+                    {"_id": name},
+                    {"$inc": {"version": 1}, "$set": {"modified_at": now}},
+                    upsert=True
+                )
+        except Exception:
+            logger.exception("Error bumping collection versions")
+        response_cache.invalidate(*collections)
+
+    def validators(self, collections, daily=False):
+        """Retourne (etag, last_modified) pour une reponse dependant des collections.
+
+        daily=True pour les reponses qui dependent aussi de la date du jour.
+        last_modified vaut None tant que la seconde de la derniere ecriture
+        n'est pas ecoulee: une seconde ecriture dans la meme seconde aurait
+        la meme date HTTP et If-Modified-Since ne la verrait pas.
+        """
+        # Avant la lecture: une ecriture posterieure tombe forcement apres read_at
+        read_at = datetime.utcnow()
+        states = self.current(collections)
+
+        parts = [f"{name}:{version}:{modified_at.timestamp()}" for name, version, modified_at in states]
+        modified_at = max(modified_at for _, _, modified_at in states)
+        last_modified = _utc(modified_at) if modified_at.replace(microsecond=0) + timedelta(seconds=1) <= read_at else None
+        if daily:
+            day = today()
+            parts.append(day.date().isoformat())
+            if last_modified is not None:
+                last_modified = max(last_modified, day.astimezone(timezone.utc))
+
+        etag = hashlib.sha1("|".join(parts).encode()).hexdigest()[:20]
+        return etag, last_modified
+
+
+versions = CollectionVersions()
+
+
+def conditional(*collections, daily=False):
+    """Ajoute ETag/Last-Modified a une vue GET et repond 304 sans executer la vue.
+
+    Les versions sont lues avant la vue et partagees avec response_cache.cached
+    (flask.g): l'ETag est celui de l'etat dont la reponse, en cache ou non, est issue.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag, last_modified = versions.validators(collections, daily)
+
+            # L'ETag prime; If-Modified-Since seul seulement si la date est sure
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains(etag)
+            else:
+                since = request.if_modified_since
+                not_modified = since is not None and last_modified is not None and last_modified <= since
+
+            if not_modified:
+                response = Response(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            # Le navigateur doit revalider a chaque fois plutot que deviner une fraicheur
+            response.cache_control.no_cache = True
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,5 @@
+# Point d'entree de production: gunicorn -c gunicorn.conf.py wsgi:app
+from config import ProdConfig
+from main import create_app
+
+app = create_app(ProdConfig)
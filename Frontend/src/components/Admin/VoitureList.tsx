@@ -146,7 +146,7 @@ const handleDelete = async (id: string) => {
                   <div className="card-image-container">
                     {voiture.image_id ? (
                       <img 
-                        src={`http://localhost:5000/api/image/${voiture.image_id}`}
+                        src={`http://localhost:5000/admin/image/${voiture.image_id}?size=card`}
                         alt={`${voiture.marque} ${voiture.modele}`}
                         className="card-image"
                         onError={({ currentTarget }) => {
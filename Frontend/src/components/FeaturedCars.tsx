@@ -21,7 +21,7 @@ const FeaturedCars = () => {
   // fetch d api hnaya by axios
   useEffect(() => {
     axios
-      .get("http://localhost:5000/")
+      .get("http://localhost:5000/?all=1")
       .then((response) => {
         const availableCars = response.data.filter((car: Car) => car.status === "disponible");// ba9i khasni nhayda hitach deja li f bd homa li dispo
   
@@ -24,7 +24,7 @@ const CarDetails = () => {
     const fetchAllCars = async () => {
       try {
         setLoading(true);
-        const response = await axios.get("http://localhost:5000/");
+        const response = await axios.get("http://localhost:5000/?all=1");
         
         if (!response.data || !Array.isArray(response.data)) {
           throw new Error("Invalid data format received from server");
@@ -11,10 +11,11 @@ import CarFilterSidebar from "@/components/CarFilterSidebar";
 import { Button } from "@/components/ui/button";
 import { Separator } from "@/components/ui/separator";
 
+const PAGE_SIZE = 24;
+
 const CarListings = () => {
   const [searchParams] = useSearchParams();
   const [sortBy, setSortBy] = useState<string>("price-asc");
-  const [cars, setCars] = useState<Car[]>([]);
   const [filteredCars, setFilteredCars] = useState<Car[]>([]);
   const [filterState, setFilterState] = useState({
     priceRange: [0, 10000],
@@ -23,71 +24,41 @@ const CarListings = () => {
     options: [] as string[],
   });
 
-  //fetch d api hnaya (normally we should have a centerlized file kay3ml fetch walakin gha than db)
+  const [total, setTotal] = useState(0);
+  const [page, setPage] = useState(1);
+
+  // Filtres, tri et pagination sont appliqués côté serveur (/cars/search)
   useEffect(() => {
+    const params = new URLSearchParams({
+      prix_min: String(filterState.priceRange[0]),
+      prix_max: String(filterState.priceRange[1]),
+      sort: sortBy,
+      page: String(page),
+      limit: String(PAGE_SIZE),
+    });
+    filterState.fuelTypes.forEach((fuel) => params.append("type_carburant", fuel));
+    filterState.options.forEach((option) => params.append("options", option));
+
     axios
-      .get("http://localhost:5000/") 
+      .get(`http://localhost:5000/cars/search?${params.toString()}`)
       .then((response) => {
-        setCars(response.data);  // Store the raw data f `cars` deja mdeclaria
+        setFilteredCars((previous) =>
+          page === 1 ? response.data.items : [...previous, ...response.data.items]
+        );
+        setTotal(response.data.total);
       })
       .catch((error) => {
         console.error("Error fetching car data:", error);
       });
-  }, []);
-
-  useEffect(() => {
-    // Apply filters whenever the filterState changes
-    let result = [...cars];  // Start with the full list of cars
-
-    // Apply filters
-    result = result.filter((car) =>
-      car.prix_journalier >= filterState.priceRange[0] &&
-      car.prix_journalier <= filterState.priceRange[1]
-    );
-
-    if (filterState.types.length > 0) {
-      result = result.filter((car) => filterState.types.includes(car.type));
-    }
-
-    if (filterState.fuelTypes.length > 0) {
-      result = result.filter((car) => filterState.fuelTypes.includes(car.type_carburant));
-    }
-
-    if (filterState.options.length > 0) {
-      result = result.filter((car) =>
-        filterState.options.every((option) => car.options.includes(option))
-      );
-    }
-    
-    switch(sortBy) {
-      case "price-asc":
-        result.sort((a, b) => a.prix_journalier - b.prix_journalier);
-        break;
-      case "price-desc":
-        result.sort((a, b) => b.prix_journalier - a.prix_journalier);
-        break;
-      case "newest":
-        result.sort((a, b) => 
-          new Date(b.date_ajout).getTime() - new Date(a.date_ajout).getTime()
-        );
-        break;
-      case "oldest":
-        result.sort((a, b) => 
-          new Date(a.date_ajout).getTime() - new Date(b.date_ajout).getTime()
-        );
-        break;
-      default:
-        break;
-    }
-
-    setFilteredCars(result);  // Set the filtered list
-  }, [filterState, cars, sortBy]);  // Trigger this effect whenever `filterState` or `cars` changes
+  }, [filterState, sortBy, page]);
 
   const handleFilterChange = (filters: any) => {
     setFilterState(filters);
+    setPage(1);
   };
 
   const clearFilters = () => {
+    setPage(1);
     setFilterState({
       priceRange: [0, 5000],
       types: [],
@@ -129,8 +100,8 @@ const CarListings = () => {
             <div className="md:w-3/4">
               <div className="flex justify-between items-center mb-6">
                 <p className="text-gray-500">
-                  {filteredCars.length} véhicule{filteredCars.length !== 1 ? "s" : ""} trouvé
-                  {filteredCars.length !== 1 ? "s" : ""}
+                  {total} véhicule{total !== 1 ? "s" : ""} trouvé
+                  {total !== 1 ? "s" : ""}
                 </p>
               
               {/* hnaya filtres de prix w date */}
@@ -138,7 +109,10 @@ const CarListings = () => {
                   <span className="text-gray-500">Trier par:</span>
                 <select 
                     value={sortBy}
-                    onChange={(e) => setSortBy(e.target.value)}
+                    onChange={(e) => {
+                      setSortBy(e.target.value);
+                      setPage(1);
+                    }}
                     className="border border-gray-300 rounded-md px-3 py-1 text-sm focus:border-carRental-primary focus:ring-1 focus:ring-carRental-primary outline-none"
                   >
                   <option value="price-asc">Prix: croissant</option>
@@ -150,11 +124,20 @@ const CarListings = () => {
               </div>
 
               {filteredCars.length > 0 ? (
-                <div className="grid grid-cols-1 md:grid-cols-2 xl:grid-cols-3 gap-6">
-                  {filteredCars.map((car) => (
-                    <CarCard key={car._id} car={car} />
-                  ))}
-                </div>
+                <>
+                  <div className="grid grid-cols-1 md:grid-cols-2 xl:grid-cols-3 gap-6">
+                    {filteredCars.map((car) => (
+                      <CarCard key={car._id} car={car} />
+                    ))}
+                  </div>
+                  {filteredCars.length < total && (
+                    <div className="mt-8 text-center">
+                      <Button variant="outline" onClick={() => setPage((p) => p + 1)}>
+                        Voir plus
+                      </Button>
+                    </div>
+                  )}
+                </>
               ) : (
                 <div className="bg-white rounded-xl p-8 text-center shadow-sm">
                   <h3 className="text-xl font-semibold mb-2">Aucun véhicule trouvé</h3>
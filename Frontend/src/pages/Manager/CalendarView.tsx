@@ -28,10 +28,15 @@ const CalendarView = () => {
       navigate("/login");
     }
 
-    // Fetch reservations from the backend
+    // Fetch only the reservations overlapping the displayed week
     const fetchReservations = async () => {
       try {
-        const response = await axios.get("http://localhost:5000/manager/calendar/reservations");
+        const response = await axios.get("http://localhost:5000/manager/calendar/reservations", {
+          params: {
+            from: format(currentWeek, "yyyy-MM-dd"),
+            to: format(addDays(currentWeek, 6), "yyyy-MM-dd"),
+          },
+        });
         setReservations(response.data.reservations);
       } catch (error) {
         console.error("Error fetching reservations:", error);
@@ -44,7 +49,7 @@ const CalendarView = () => {
     };
 
     fetchReservations();
-  }, [navigate]);
+  }, [navigate, currentWeek]);
 
   // Helper to get array of 7 days starting from currentWeek
   const getDaysInWeek = () => {
@@ -18,6 +18,7 @@ const ListeClients = () => {
   const [dialogOpen, setDialogOpen] = useState(false);
   const [editMode, setEditMode] = useState(false);
   const [search, setSearch] = useState("");
+  const [searchResults, setSearchResults] = useState(null);
   const [newClient, setNewClient] = useState({
     nom: "",
     prenom: "",
@@ -163,15 +164,29 @@ const ListeClients = () => {
     setDialogOpen(true);
   };
 
-  // Filtered clients
-  const filteredClients = clients.filter(
-    (client) =>
-      client.nom.toLowerCase().includes(search.toLowerCase()) ||
-      client.prenom.toLowerCase().includes(search.toLowerCase()) ||
-      client.email.toLowerCase().includes(search.toLowerCase()) ||
-      client.telephone.toLowerCase().includes(search.toLowerCase()) ||
-      (client.CIN && client.CIN.toLowerCase().includes(search.toLowerCase()))
-  );
+  // Recherche côté serveur (CIN, téléphone, permis, email, nom), relancée après chaque modification
+  useEffect(() => {
+    const query = search.trim();
+    if (!query) {
+      setSearchResults(null);
+      return;
+    }
+
+    const timeout = setTimeout(async () => {
+      try {
+        const response = await axios.get("http://localhost:5000/manager/clients/search", {
+          params: { q: query },
+        });
+        setSearchResults(response.data.clients);
+      } catch (error) {
+        console.error("Error searching clients:", error);
+      }
+    }, 250);
+
+    return () => clearTimeout(timeout);
+  }, [search, clients]);
+
+  const filteredClients = searchResults ?? clients;
 
   return (
     <div className="p-6 space-y-6">
@@ -27,7 +27,7 @@ const ReservationsHistory = () => {
     // Fetch reservations from backend
     const fetchReservations = async () => {
     try {
-      const response = await axios.get("http://localhost:5000/manager/reservations");
+      const response = await axios.get("http://localhost:5000/manager/reservations?all=1");
 
       // Map backend response to frontend structure
       const mappedReservations = response.data.map((reservation: any) => ({
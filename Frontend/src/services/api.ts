@@ -19,12 +19,12 @@ const getReservations = async () => {
 };
 
 const getClients = async () => {
-  const response = await axios.get(`${API_URL}/admin/clients`);
+  const response = await axios.get(`${API_URL}/admin/clients?all=1`);
   return response.data;
 };
 
 const getManagers = async () => {
-  const response = await axios.get(`${API_URL}/admin/managers`);
+  const response = await axios.get(`${API_URL}/admin/managers?all=1`);
   return response.data;
 };
 
@@ -51,7 +51,7 @@ const updateReservationStatus = async (reservationId, status) => {
 };
 // api.ts
 const getVoitures = async () => {
-  const response = await axios.get(`${API_URL}/admin/voiture`);
+  const response = await axios.get(`${API_URL}/admin/voiture?all=1`);
   return response.data;
 };
 
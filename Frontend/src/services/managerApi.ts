@@ -5,7 +5,7 @@ const API_URL = "http://localhost:5000/";
 // Reservations
 export const getReservations = async () => {
   const response = await axios.get(`${API_URL}manager/reservations`, {
-    params: { populate: "client_id,voiture_id" }
+    params: { populate: "client_id,voiture_id", all: 1 }
   });
   return response.data;
 };